@@ -4,11 +4,18 @@
 Downloads the default Piper voice and espeak-ng-data.
 """
 
+import bz2
+import hashlib
 import os
+import shutil
+import subprocess
 import sys
 import tarfile
-import tempfile
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO, Optional
 
 try:
     import httpx
@@ -29,9 +36,30 @@ DEFAULT_VOICE = "en_US-lessac-medium"
 VOICE_URL = "https://github.com/k2-fsa/sherpa-onnx/releases/download/tts-models/vits-piper-en_US-lessac-medium.tar.bz2"
 ESPEAK_URL = "https://github.com/k2-fsa/sherpa-onnx/releases/download/tts-models/espeak-ng-data.tar.bz2"
 
+# The release archives above are not pinned to known digests, so downloads
+# are only verified when an expected SHA-256 is supplied through these
+# environment variables. Otherwise the digest is just reported.
+EXPECTED_VOICE_SHA256: Optional[str] = os.environ.get("SPEAKUP_VOICE_SHA256") or None
+EXPECTED_ESPEAK_SHA256: Optional[str] = os.environ.get("SPEAKUP_ESPEAK_SHA256") or None
 
-def download_file(url: str, dest_path: Path, description: str) -> bool:
-    """Download a file with progress indication."""
+# Large reads mean one write() per MB instead of one per 8KB
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+PROGRESS_STEP = 5 << 20
+
+# Files at least this big are written by a thread pool during extraction;
+# below it the hand-off costs more than the write
+PARALLEL_WRITE_MIN_SIZE = 4 << 10
+
+
+def download_file(
+    url: str, dest: BinaryIO, description: str, expected_sha256: Optional[str] = None
+) -> bool:
+    """Download a file with progress indication into an open binary stream.
+
+    The SHA-256 is computed on the same chunks as they are written, at no
+    extra pass over the data. It is checked only if expected_sha256 is given;
+    otherwise it is printed, unverified.
+    """
     print(f"\nDownloading {description}...")
     print(f"  URL: {url}")
 
@@ -40,51 +68,243 @@ def download_file(url: str, dest_path: Path, description: str) -> bool:
             response.raise_for_status()
             total = int(response.headers.get("content-length", 0))
 
-            with open(dest_path, "wb") as f:
-                downloaded = 0
-                for chunk in response.iter_bytes(chunk_size=8192):
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    if total:
-                        pct = (downloaded / total) * 100
-                        print(f"\r  Progress: {pct:.1f}% ({downloaded // 1024 // 1024}MB / {total // 1024 // 1024}MB)", end="")
-                print()
+            digest = hashlib.sha256()
+            downloaded = 0
+            last_reported = 0
+            for chunk in response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                dest.write(chunk)
+                downloaded += len(chunk)
+                # Only redraw progress every few MB, and once at the end
+                if total and (downloaded - last_reported >= PROGRESS_STEP or downloaded == total):
+                    last_reported = downloaded
+                    pct = (downloaded / total) * 100
+                    print(f"  {description}: {pct:.1f}% ({downloaded // 1024 // 1024}MB / {total // 1024 // 1024}MB)")
+
+        sha256 = digest.hexdigest()
+        if expected_sha256 is None:
+            print(f"  {description} sha256 (not verified): {sha256}")
+        elif sha256 != expected_sha256.lower():
+            print(f"  Error: checksum mismatch for {description}")
+            print(f"    expected {expected_sha256}")
+            print(f"    got      {sha256}")
+            return False
         return True
     except Exception as e:
-        print(f"\n  Error: {e}")
+        print(f"  Error downloading {description}: {e}")
         return False
 
 
-def extract_tar(archive_path: Path, dest_dir: Path, strip_components: int = 0):
-    """Extract a tar archive."""
-    print(f"  Extracting to {dest_dir}...")
-
-    # Determine compression
-    if str(archive_path).endswith(".tar.gz") or str(archive_path).endswith(".tgz"):
-        mode = "r:gz"
-    elif str(archive_path).endswith(".tar.bz2"):
-        mode = "r:bz2"
+def decompressor_for(url: str):
+    """Pick an incremental decompressor for an archive URL, or None if uncompressed."""
+    if url.endswith(".tar.gz") or url.endswith(".tgz"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif url.endswith(".tar.bz2"):
+        return bz2.BZ2Decompressor()
     else:
-        mode = "r"
-
-    dest_dir.mkdir(parents=True, exist_ok=True)
-
-    with tarfile.open(archive_path, mode) as tar:
-        for member in tar.getmembers():
-            # Strip leading path components
+        return None
+
+
+class DecompressingWriter:
+    """Binary sink that decompresses each chunk before passing it on."""
+
+    def __init__(self, sink: BinaryIO, decompressor):
+        self._sink = sink
+        self._decompressor = decompressor
+
+    def write(self, data: bytes) -> int:
+        self._sink.write(self._decompressor.decompress(data))
+        return len(data)
+
+
+def write_member(path: Path, data: bytes, mode: int, mtime: float):
+    """Write one extracted file and restore its mode and mtime."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    os.chmod(path, mode & 0o777)
+    os.utime(path, (mtime, mtime))
+
+
+def strip_path(name: str, strip_components: int) -> Optional[str]:
+    """Drop leading path components, or return None if too few remain.
+
+    Locates the Nth "/" instead of building a list of parts per member.
+    """
+    idx = -1
+    for _ in range(strip_components):
+        idx = name.find("/", idx + 1)
+        if idx < 0:
+            return None
+    return name[idx + 1:]
+
+
+def extract_tar(fileobj: BinaryIO, dest_dir: Path, strip_components: int = 0):
+    """Extract an uncompressed tar stream as it is read, without seeking.
+
+    Streaming mode yields members as they are decoded instead of building
+    the full member table up front. Member data has to be read in stream
+    order, but writing it out does not, so larger files are handed to a
+    thread pool while the next header is parsed. A hard link waits for any
+    pending write of its target, since it can't be created before the
+    target exists.
+    """
+    dest_root = dest_dir.resolve()
+    workers = os.cpu_count() or 4
+    # Bound how many read-but-unwritten files sit in memory
+    in_flight = threading.BoundedSemaphore(workers * 2)
+    futures = []
+    # Pool writes by destination path, so hard links can wait on them
+    pending = {}
+
+    def write_and_release(path, data, mode, mtime):
+        try:
+            write_member(path, data, mode, mtime)
+        finally:
+            in_flight.release()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool, \
+            tarfile.open(fileobj=fileobj, mode="r|") as tar:
+        for member in tar:
             if strip_components > 0:
-                parts = member.name.split("/")
-                if len(parts) <= strip_components:
+                name = strip_path(member.name, strip_components)
+                if name is None:
                     continue
-                member.name = "/".join(parts[strip_components:])
+                member.name = name
+                # Hard link targets are archive paths, stripped the same way
+                if member.islnk():
+                    linkname = strip_path(member.linkname, strip_components)
+                    if not linkname:
+                        continue
+                    member.linkname = linkname
 
             # Skip empty names
             if not member.name:
                 continue
 
-            tar.extract(member, dest_dir)
+            if member.islnk():
+                target = pending.pop((dest_root / member.linkname).resolve(), None)
+                if target is not None:
+                    target.result()
 
-    print("  Done!")
+            if not member.isfile() or member.size < PARALLEL_WRITE_MIN_SIZE:
+                tar.extract(member, dest_dir)
+                continue
+
+            # tar.extract guards against paths escaping dest_dir; do the same here
+            path = (dest_root / member.name).resolve()
+            if not path.is_relative_to(dest_root):
+                raise tarfile.TarError(f"Refusing to extract outside {dest_dir}: {member.name}")
+
+            data = tar.extractfile(member).read()
+            in_flight.acquire()
+            future = pool.submit(write_and_release, path, data, member.mode, member.mtime)
+            futures.append(future)
+            pending[path] = future
+
+    # Surface the first write error, if any
+    for future in futures:
+        future.result()
+
+
+def download_and_extract_lbzip2(
+    url: str,
+    dest_dir: Path,
+    description: str,
+    strip_components: int = 0,
+    expected_sha256: Optional[str] = None,
+) -> Optional[bool]:
+    """Download a .tar.bz2 archive straight into a parallel lbzip2 | tar pipeline.
+
+    Returns None if lbzip2 or tar is not installed, so the caller can fall
+    back to the pure-Python tarfile path.
+    """
+    lbzip2 = shutil.which("lbzip2")
+    tar = shutil.which("tar")
+    if not lbzip2 or not tar:
+        return None
+
+    decompress = subprocess.Popen(
+        [lbzip2, "-dc"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    untar = subprocess.Popen(
+        [tar, "-x", "-C", str(dest_dir), f"--strip-components={strip_components}"],
+        stdin=decompress.stdout,
+    )
+    # Let lbzip2 receive SIGPIPE if tar exits early
+    decompress.stdout.close()
+
+    ok = download_file(url, decompress.stdin, description, expected_sha256)
+    decompress.stdin.close()
+
+    untar.wait()
+    decompress.wait()
+    if decompress.returncode != 0 or untar.returncode != 0:
+        print(f"  Error: lbzip2/tar pipeline failed (lbzip2={decompress.returncode}, tar={untar.returncode})")
+        return False
+    return ok
+
+
+def download_and_extract(
+    url: str,
+    dest_dir: Path,
+    description: str,
+    strip_components: int = 0,
+    expected_sha256: Optional[str] = None,
+) -> bool:
+    """Download a tar archive and extract it while it downloads.
+
+    The compressed bytes never touch the disk: they are piped from the
+    HTTP response straight into the decompressor. Since files land before
+    the checksum is known, a failed download removes dest_dir again so the
+    next run retries instead of finding a partial install.
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    print(f"  Extracting to {dest_dir}...")
+
+    # bz2 decoding is single-threaded in Python; lbzip2 uses every core
+    if url.endswith(".tar.bz2"):
+        ok = download_and_extract_lbzip2(
+            url, dest_dir, description, strip_components, expected_sha256
+        )
+        if ok is not None:
+            if ok:
+                print("  Done!")
+            else:
+                shutil.rmtree(dest_dir, ignore_errors=True)
+            return ok
+
+    read_fd, write_fd = os.pipe()
+    result = {"ok": False}
+    decompressor = decompressor_for(url)
+
+    # Decompress on the download thread (bz2/zlib release the GIL) so tarfile
+    # only parses plain tar blocks and writes files on this one
+    def feed():
+        with os.fdopen(write_fd, "wb") as sink:
+            writer = DecompressingWriter(sink, decompressor) if decompressor else sink
+            result["ok"] = download_file(url, writer, description, expected_sha256)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    try:
+        with os.fdopen(read_fd, "rb") as source:
+            extract_tar(source, dest_dir, strip_components)
+    except (tarfile.TarError, EOFError, OSError) as e:
+        print(f"  Error: {e}")
+        feeder.join()
+        shutil.rmtree(dest_dir, ignore_errors=True)
+        return False
+
+    feeder.join()
+    if result["ok"]:
+        print("  Done!")
+    else:
+        shutil.rmtree(dest_dir, ignore_errors=True)
+    return result["ok"]
 
 
 def setup_voice():
@@ -97,36 +317,30 @@ def setup_voice():
         return True
 
     print(f"\nSetting up voice: {DEFAULT_VOICE}")
-    voice_dir.mkdir(parents=True, exist_ok=True)
 
-    with tempfile.NamedTemporaryFile(suffix=".tar.bz2", delete=False) as tmp:
-        tmp_path = Path(tmp.name)
-
-    try:
-        if not download_file(VOICE_URL, tmp_path, f"voice {DEFAULT_VOICE}"):
-            return False
-
-        # sherpa-onnx archives extract to vits-piper-{voice}/ folder
-        extract_tar(tmp_path, voice_dir, strip_components=1)
+    # sherpa-onnx archives extract to vits-piper-{voice}/ folder
+    if not download_and_extract(
+        VOICE_URL, voice_dir, f"voice {DEFAULT_VOICE}",
+        strip_components=1, expected_sha256=EXPECTED_VOICE_SHA256,
+    ):
+        return False
 
-        # Verify installation
-        if model_file.exists():
+    # Verify installation
+    if model_file.exists():
+        print(f"  Voice installed successfully!")
+        return True
+    else:
+        # Try alternative naming - might be just model.onnx
+        alt_model = voice_dir / "model.onnx"
+        if alt_model.exists():
+            # Rename to expected name
+            alt_model.rename(model_file)
             print(f"  Voice installed successfully!")
             return True
-        else:
-            # Try alternative naming - might be just model.onnx
-            alt_model = voice_dir / "model.onnx"
-            if alt_model.exists():
-                # Rename to expected name
-                alt_model.rename(model_file)
-                print(f"  Voice installed successfully!")
-                return True
-            print(f"  Error: Model file not found after extraction")
-            print(f"  Looking for: {model_file}")
-            print(f"  Contents: {list(voice_dir.iterdir())}")
-            return False
-    finally:
-        tmp_path.unlink(missing_ok=True)
+        print(f"  Error: Model file not found after extraction")
+        print(f"  Looking for: {model_file}")
+        print(f"  Contents: {list(voice_dir.iterdir())}")
+        return False
 
 
 def setup_espeak():
@@ -137,26 +351,20 @@ def setup_espeak():
         return True
 
     print(f"\nSetting up espeak-ng-data")
-    ESPEAK_DIR.mkdir(parents=True, exist_ok=True)
-
-    with tempfile.NamedTemporaryFile(suffix=".tar.bz2", delete=False) as tmp:
-        tmp_path = Path(tmp.name)
 
-    try:
-        if not download_file(ESPEAK_URL, tmp_path, "espeak-ng-data"):
-            return False
-
-        extract_tar(tmp_path, ESPEAK_DIR, strip_components=1)
+    if not download_and_extract(
+        ESPEAK_URL, ESPEAK_DIR, "espeak-ng-data",
+        strip_components=1, expected_sha256=EXPECTED_ESPEAK_SHA256,
+    ):
+        return False
 
-        # Verify installation
-        if (ESPEAK_DIR / "phontab").exists():
-            print(f"  espeak-ng-data installed successfully!")
-            return True
-        else:
-            print(f"  Error: espeak-ng-data files not found after extraction")
-            return False
-    finally:
-        tmp_path.unlink(missing_ok=True)
+    # Verify installation
+    if (ESPEAK_DIR / "phontab").exists():
+        print(f"  espeak-ng-data installed successfully!")
+        return True
+    else:
+        print(f"  Error: espeak-ng-data files not found after extraction")
+        return False
 
 
 def print_claude_config():
@@ -199,9 +407,12 @@ def main():
     # Create base directory
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Setup components
-    voice_ok = setup_voice()
-    espeak_ok = setup_espeak()
+    # Setup components - both are independent downloads, so overlap them
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        voice_future = pool.submit(setup_voice)
+        espeak_future = pool.submit(setup_espeak)
+        voice_ok = voice_future.result()
+        espeak_ok = espeak_future.result()
 
     if voice_ok and espeak_ok:
         print_claude_config()
@@ -1,22 +1,23 @@
 """CLI commands for SpeakUp."""
 
 import argparse
-import json
 import os
-import signal
-import subprocess
 import sys
 import time
 from pathlib import Path
-from urllib.error import URLError
-from urllib.request import Request, urlopen
 
-from .service import DEFAULT_PORT, get_service_pid, PID_FILE
+from . import json_codec
+from .config import DEFAULT_PORT, get_service_pid, PID_FILE
+from .service_client import ServiceClient, wait_until
 from .voice_manager import is_bundled_mode, get_bundled_voices_dir
 
 __version__ = "1.0.0"
 
-SERVICE_URL = f"http://127.0.0.1:{DEFAULT_PORT}"
+# A healthy probe is trusted for this long so back-to-back checks skip the round-trip
+HEALTH_CACHE_TTL = 0.5
+
+# One keep-alive connection reused by every api_call in this process
+_client = ServiceClient(health_ttl=HEALTH_CACHE_TTL)
 
 CLAUDE_MD_SNIPPET = '''## Voice/TTS (Text-to-Speech)
 
@@ -48,39 +49,29 @@ Use `mcp__tts__stop_tool` to stop speech mid-playback.
 
 def api_call(endpoint: str, method: str = "GET", data: dict = None) -> dict:
     """Make API call to service."""
-    url = f"{SERVICE_URL}{endpoint}"
-    headers = {"Content-Type": "application/json"}
+    return _client.request(endpoint, method=method, data=data, timeout=5)
 
-    if data:
-        body = json.dumps(data).encode()
-        req = Request(url, data=body, headers=headers, method=method)
-    else:
-        req = Request(url, headers=headers, method=method)
 
-    try:
-        with urlopen(req, timeout=5) as response:
-            return json.loads(response.read())
-    except URLError as e:
-        return {"error": f"Service not reachable: {e}"}
+def is_service_running() -> bool:
+    """Check if service is running and responsive.
+
+    Only positive results are cached, so waiting for startup still re-probes.
+    """
+    return _client.is_running(timeout=5)
 
 
-def is_service_running() -> bool:
-    """Check if service is running and responsive."""
-    try:
-        result = api_call("/api/health")
-        return result.get("status") == "ok"
-    except Exception:
-        return False
+def forget_service_state():
+    """Drop the cached health probe, e.g. after stopping the service."""
+    _client.forget_health()
 
 
 def cmd_status(args):
     """Show queue status."""
-    if not is_service_running():
+    result = api_call("/api/status")
+    if result.get("unreachable"):
         print("Service is not running.")
         print(f"Start it with: speakup service")
         return 1
-
-    result = api_call("/api/status")
     if "error" in result:
         print(f"Error: {result['error']}")
         return 1
@@ -88,34 +79,35 @@ def cmd_status(args):
     playing = result.get("playing")
     queued = result.get("queued", [])
 
-    print("=== SpeakUp Status ===\n")
+    # Collect the report and write it once rather than one write per line
+    out = ["=== SpeakUp Status ===", ""]
 
     if playing:
-        print(f"NOW PLAYING:")
-        print(f"  [{playing['project']}] {playing['text'][:60]}...")
+        out.append(f"NOW PLAYING:")
+        out.append(f"  [{playing['project']}] {playing['text'][:60]}...")
     else:
-        print("NOW PLAYING: (nothing)")
+        out.append("NOW PLAYING: (nothing)")
 
-    print(f"\nQUEUE ({len(queued)}):")
+    out.append(f"\nQUEUE ({len(queued)}):")
     if queued:
         for msg in queued[:5]:
             text = msg['text'][:50] + "..." if len(msg['text']) > 50 else msg['text']
-            print(f"  [{msg['project']}] {text}")
+            out.append(f"  [{msg['project']}] {text}")
         if len(queued) > 5:
-            print(f"  ... and {len(queued) - 5} more")
+            out.append(f"  ... and {len(queued) - 5} more")
     else:
-        print("  (empty)")
+        out.append("  (empty)")
 
+    sys.stdout.write("\n".join(out) + "\n")
     return 0
 
 
 def cmd_history(args):
     """Show message history."""
-    if not is_service_running():
+    result = api_call("/api/history")
+    if result.get("unreachable"):
         print("Service is not running.")
         return 1
-
-    result = api_call("/api/history")
     if "error" in result:
         print(f"Error: {result['error']}")
         return 1
@@ -123,10 +115,11 @@ def cmd_history(args):
     messages = result.get("messages", [])
     limit = args.limit or 20
 
-    print("=== SpeakUp History ===\n")
+    out = ["=== SpeakUp History ===", ""]
 
     if not messages:
-        print("No history yet.")
+        out.append("No history yet.")
+        sys.stdout.write("\n".join(out) + "\n")
         return 0
 
     for msg in messages[:limit]:
@@ -140,18 +133,18 @@ def cmd_history(args):
         else:
             time_str = created[:8] if created else ''
         text = msg['text'][:60] + "..." if len(msg['text']) > 60 else msg['text']
-        print(f"[{time_str}] [{status:7}] {msg['project']}: {text}")
+        out.append(f"[{time_str}] [{status:7}] {msg['project']}: {text}")
 
+    sys.stdout.write("\n".join(out) + "\n")
     return 0
 
 
 def cmd_stop(args):
     """Stop playback and clear queue."""
-    if not is_service_running():
+    result = api_call("/api/stop", method="POST")
+    if result.get("unreachable"):
         print("Service is not running.")
         return 1
-
-    result = api_call("/api/stop", method="POST")
     if "error" in result:
         print(f"Error: {result['error']}")
         return 1
@@ -180,6 +173,10 @@ def cmd_web(args):
 
 def cmd_service(args):
     """Start the service."""
+    # Only service management needs these; keep them off the other commands' startup path
+    import signal
+    import subprocess
+
     if args.action == "start":
         if is_service_running():
             print(f"Service already running (PID {get_service_pid()})")
@@ -196,12 +193,10 @@ def cmd_service(args):
         )
 
         # Wait for it to start
-        for _ in range(20):
-            time.sleep(0.25)
-            if is_service_running():
-                print(f"Service started (PID {get_service_pid()})")
-                print(f"Web UI: http://127.0.0.1:{DEFAULT_PORT}")
-                return 0
+        if wait_until(is_service_running):
+            print(f"Service started (PID {get_service_pid()})")
+            print(f"Web UI: http://127.0.0.1:{DEFAULT_PORT}")
+            return 0
 
         print("Failed to start service. Check logs.")
         return 1
@@ -213,14 +208,14 @@ def cmd_service(args):
             return 0
 
         print(f"Stopping service (PID {pid})...")
+        forget_service_state()
+        _client.close()
         try:
             os.kill(pid, signal.SIGTERM)
             # Wait for it to stop
-            for _ in range(20):
-                time.sleep(0.25)
-                if not get_service_pid():
-                    print("Service stopped.")
-                    return 0
+            if wait_until(lambda: not get_service_pid()):
+                print("Service stopped.")
+                return 0
             print("Service did not stop gracefully.")
             return 1
         except ProcessLookupError:
@@ -303,9 +298,9 @@ def cmd_init(args):
 
     if mcp_path.exists():
         try:
-            mcp_config = json.loads(mcp_path.read_text())
+            mcp_config = json_codec.loads(mcp_path.read_bytes())
             print(f"Found existing .mcp.json")
-        except json.JSONDecodeError:
+        except json_codec.JSONDecodeError:
             print(f"Warning: .mcp.json exists but is invalid JSON, will overwrite")
             mcp_config = {}
 
@@ -316,7 +311,7 @@ def cmd_init(args):
     # Add or update tts server config
     mcp_config["mcpServers"]["tts"] = get_mcp_server_config(project_name, announce)
 
-    mcp_path.write_text(json.dumps(mcp_config, indent=2) + "\n")
+    mcp_path.write_bytes(json_codec.dumps(mcp_config, indent=True, newline=True))
     print(f"  Updated .mcp.json with TTS config")
 
     # 2. Create or update .claude/CLAUDE.md
@@ -0,0 +1,23 @@
+"""Where the SpeakUp service lives, shared by the service and its clients.
+
+Kept free of audio and TTS imports so the CLI and MCP server can find the
+service without loading the engine.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_PORT = 7849
+PID_FILE = Path.home() / ".speakup" / "service.pid"
+
+
+def get_service_pid() -> Optional[int]:
+    """Get PID of running service, or None if not running."""
+    try:
+        pid = int(PID_FILE.read_text().strip())
+        # Check if process is actually running
+        os.kill(pid, 0)
+        return pid
+    except (FileNotFoundError, ValueError, ProcessLookupError, PermissionError):
+        return None
@@ -1,37 +1,172 @@
 """SQLite history storage for SpeakUp messages."""
 
+import itertools
+import queue
 import sqlite3
+import sys
 import threading
-from datetime import datetime
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional
+
+# Statements are module constants so each thread's connection parses them once
+# and then hits its statement cache on every call
+_SQL_ADD = """
+    INSERT INTO messages (id, project, text, tone, status)
+    VALUES (?, ?, ?, ?, 'queued')
+"""
+_SQL_MAX_ID = """
+    SELECT MAX(
+        COALESCE((SELECT MAX(id) FROM messages), 0),
+        COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'messages'), 0)
+    )
+"""
+_SQL_MARK_PLAYING = "UPDATE messages SET status = 'playing' WHERE id = ?"
+_SQL_MARK_PLAYED = """
+    UPDATE messages
+    SET status = 'played', played_at = CURRENT_TIMESTAMP, duration_ms = ?
+    WHERE id = ?
+"""
+_SQL_MARK_SKIPPED = "UPDATE messages SET status = 'skipped' WHERE id = ?"
+# The redundant status IN (...) terms below repeat idx_messages_active's
+# WHERE clause; SQLite only uses a partial index when the query states it
+_SQL_SKIP_QUEUED = """
+    UPDATE messages SET status = 'skipped'
+    WHERE status IN ('queued', 'playing') AND status = 'queued'
+"""
+_SQL_RECENT = """
+    SELECT id, project, text, tone, status, created_at, played_at, duration_ms
+    FROM messages
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+_SQL_QUEUED = """
+    SELECT id, project, text, tone, status, created_at
+    FROM messages
+    WHERE status IN ('queued', 'playing') AND status = 'queued'
+    ORDER BY created_at ASC
+"""
+_SQL_PLAYING = """
+    SELECT id, project, text, tone, status, created_at
+    FROM messages
+    WHERE status IN ('queued', 'playing') AND status = 'playing'
+    LIMIT 1
+"""
+_SQL_ACTIVE = """
+    SELECT id, project, text, tone, status, created_at
+    FROM messages
+    WHERE status IN ('queued', 'playing')
+    ORDER BY CASE status WHEN 'playing' THEN 0 ELSE 1 END, created_at ASC, id ASC
+"""
+_SQL_CLEANUP = """
+    DELETE FROM messages
+    WHERE id IN (
+        SELECT id FROM messages
+        WHERE created_at < datetime('now', ?)
+        ORDER BY created_at
+        LIMIT ?
+    )
+"""
+
+# Rows deleted per transaction in cleanup_old, so the writer lock is only
+# held briefly, and free pages returned to the filesystem afterwards
+CLEANUP_CHUNK_SIZE = 500
+VACUUM_PAGES = 1000
+
+# Most queued writes the writer thread commits in one transaction
+WRITE_BATCH_SIZE = 64
+
+_Write = Callable[[sqlite3.Connection], object]
 
 
 class HistoryStore:
-    """Stores message history in SQLite."""
+    """Stores message history in SQLite.
+
+    The database must be a file: each thread opens its own connection, and
+    every connection to ":memory:" would be a separate, empty database.
+    """
 
     def __init__(self, db_path: Optional[Path] = None):
         if db_path is None:
             db_path = Path.home() / ".speakup" / "history.db"
+        if str(db_path) == ":memory:":
+            raise ValueError("HistoryStore needs a database file, not :memory:")
 
         db_path.parent.mkdir(parents=True, exist_ok=True)
         self._db_path = db_path
         self._local = threading.local()
+        # Bumped on every write made through this store, so readers can tell
+        # whether anything changed without querying. Seeded from the clock so
+        # a restarted service never repeats a version a client has seen.
+        self._versions = itertools.count(time.time_ns() // 1_000_000)
+        self.version = next(self._versions)
         self._init_db()
 
+        # Routine writes are queued and applied, in order, by one writer
+        # thread, so callers never wait on SQLite. Message IDs are handed out
+        # here rather than by the INSERT. Reads and the count-returning
+        # writes first wait for anything still queued (see flush()). None on
+        # the queue tells the writer to stop (see close()).
+        self._ids = itertools.count(self._get_conn().execute(_SQL_MAX_ID).fetchone()[0] + 1)
+        self._writes: queue.Queue[Optional[tuple[int, _Write]]] = queue.Queue()
+        self._write_seq = itertools.count(1)
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        self._submitted = 0
+        self._written = 0
+        self._written_cond = threading.Condition()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
     def _get_conn(self) -> sqlite3.Connection:
-        """Get thread-local database connection."""
+        """Get thread-local database connection.
+
+        Connections never leave the thread that opened them, so the
+        same-thread check stays on. They run in autocommit mode; multi-
+        statement writes use _transaction().
+        """
         if not hasattr(self._local, "conn"):
             self._local.conn = sqlite3.connect(
                 self._db_path,
-                check_same_thread=False
+                check_same_thread=True,
+                isolation_level=None,
+                cached_statements=256
             )
             self._local.conn.row_factory = sqlite3.Row
+            # fsync only at WAL checkpoints, keep temp data and a larger
+            # page cache in memory, and wait on locks instead of failing
+            self._local.conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn.execute("PRAGMA cache_size=-8000")
+            self._local.conn.execute("PRAGMA busy_timeout=5000")
         return self._local.conn
 
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run several statements in one explicit transaction."""
+        conn = self._get_conn()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            # A failed COMMIT (e.g. SQLITE_BUSY) leaves the transaction open,
+            # and the next BEGIN on this connection would then fail too
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
     def _init_db(self) -> None:
         """Initialize database schema."""
         conn = self._get_conn()
+        # Lets cleanup_old hand freed pages back to the filesystem. Only takes
+        # effect on a new database, before the first table is created.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # WAL lets readers and the queue worker's writes proceed concurrently.
+        # It is persistent in the file, so set it once here rather than from
+        # every thread's connection.
+        conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("""
             CREATE TABLE IF NOT EXISTS messages (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -48,11 +183,17 @@ class HistoryStore:
             CREATE INDEX IF NOT EXISTS idx_messages_created
             ON messages(created_at DESC)
         """)
+        # One partial index holds only the few active rows, unlike a full
+        # status index that is mostly played/skipped entries, so status polls
+        # stay cheap however large the history grows. Earlier databases may
+        # still have the indexes it replaces.
+        for index in ("idx_messages_status", "idx_messages_queued", "idx_messages_playing"):
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
         conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_messages_status
-            ON messages(status)
+            CREATE INDEX IF NOT EXISTS idx_messages_active
+            ON messages(status, created_at)
+            WHERE status IN ('queued', 'playing')
         """)
-        conn.commit()
 
     def add_message(
         self,
@@ -60,108 +201,194 @@ class HistoryStore:
         text: str,
         tone: str = "neutral"
     ) -> int:
-        """Add a message to history. Returns message ID."""
-        conn = self._get_conn()
-        cursor = conn.execute(
-            """
-            INSERT INTO messages (project, text, tone, status)
-            VALUES (?, ?, ?, 'queued')
-            """,
-            (project, text, tone)
-        )
-        conn.commit()
-        return cursor.lastrowid
+        """Add a message to history. Returns message ID.
+
+        The row is written in the background; the ID is valid immediately.
+        """
+        message_id = next(self._ids)
+        self._submit(lambda conn: conn.execute(_SQL_ADD, (message_id, project, text, tone)))
+        return message_id
 
     def mark_playing(self, message_id: int) -> None:
         """Mark a message as currently playing."""
-        conn = self._get_conn()
-        conn.execute(
-            "UPDATE messages SET status = 'playing' WHERE id = ?",
-            (message_id,)
-        )
-        conn.commit()
+        self._submit(lambda conn: conn.execute(_SQL_MARK_PLAYING, (message_id,)))
 
     def mark_played(self, message_id: int, duration_ms: float) -> None:
         """Mark a message as played."""
-        conn = self._get_conn()
-        conn.execute(
-            """
-            UPDATE messages
-            SET status = 'played', played_at = ?, duration_ms = ?
-            WHERE id = ?
-            """,
-            (datetime.now().isoformat(), duration_ms, message_id)
-        )
-        conn.commit()
+        self._submit(lambda conn: conn.execute(_SQL_MARK_PLAYED, (duration_ms, message_id)))
 
     def mark_skipped(self, message_id: int) -> None:
         """Mark a message as skipped (cleared from queue)."""
-        conn = self._get_conn()
-        conn.execute(
-            "UPDATE messages SET status = 'skipped' WHERE id = ?",
-            (message_id,)
-        )
-        conn.commit()
+        self._submit(lambda conn: conn.execute(_SQL_MARK_SKIPPED, (message_id,)))
+
+    def mark_skipped_many(self, message_ids: list[int]) -> None:
+        """Mark several messages as skipped in a single transaction."""
+        if not message_ids:
+            return
+        # executemany reuses the one cached statement, whatever the batch size
+        params = [(message_id,) for message_id in message_ids]
+        self._submit(lambda conn: conn.executemany(_SQL_MARK_SKIPPED, params))
 
     def mark_queued_as_skipped(self) -> int:
         """Mark all queued messages as skipped. Returns count."""
+        self.flush()
         conn = self._get_conn()
-        cursor = conn.execute(
-            "UPDATE messages SET status = 'skipped' WHERE status = 'queued'"
-        )
-        conn.commit()
+        cursor = conn.execute(_SQL_SKIP_QUEUED)
+        self._bump()
         return cursor.rowcount
 
-    def get_recent(self, limit: int = 50) -> list[dict]:
-        """Get recent messages."""
+    def iter_recent(self, limit: int = 50) -> Iterator[sqlite3.Row]:
+        """Yield recent messages one at a time, newest first.
+
+        Rows are read from the cursor as they are consumed, so a caller
+        that encodes them one by one never holds the whole result. Consume
+        the iterator on the calling thread.
+        """
+        self.flush()
         conn = self._get_conn()
-        cursor = conn.execute(
-            """
-            SELECT id, project, text, tone, status, created_at, played_at, duration_ms
-            FROM messages
-            ORDER BY created_at DESC
-            LIMIT ?
-            """,
-            (limit,)
-        )
-        return [dict(row) for row in cursor.fetchall()]
-
-    def get_queued(self) -> list[dict]:
+        yield from conn.execute(_SQL_RECENT, (limit,))
+
+    def get_recent(self, limit: int = 50) -> list[sqlite3.Row]:
+        """Get recent messages.
+
+        Rows support mapping-style access; callers that need real dicts
+        (e.g. for JSON) convert them with dict(row).
+        """
+        return list(self.iter_recent(limit))
+
+    def get_queued(self) -> list[sqlite3.Row]:
         """Get all queued messages in order."""
+        self.flush()
         conn = self._get_conn()
-        cursor = conn.execute(
-            """
-            SELECT id, project, text, tone, status, created_at
-            FROM messages
-            WHERE status = 'queued'
-            ORDER BY created_at ASC
-            """
-        )
-        return [dict(row) for row in cursor.fetchall()]
-
-    def get_playing(self) -> Optional[dict]:
+        cursor = conn.execute(_SQL_QUEUED)
+        return cursor.fetchall()
+
+    def get_playing(self) -> Optional[sqlite3.Row]:
         """Get currently playing message, if any."""
+        self.flush()
         conn = self._get_conn()
-        cursor = conn.execute(
-            """
-            SELECT id, project, text, tone, status, created_at
-            FROM messages
-            WHERE status = 'playing'
-            LIMIT 1
-            """
-        )
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        cursor = conn.execute(_SQL_PLAYING)
+        return cursor.fetchone()
+
+    def get_active(self) -> list[sqlite3.Row]:
+        """Get the playing message (first, if any) followed by queued ones in order."""
+        self.flush()
+        conn = self._get_conn()
+        cursor = conn.execute(_SQL_ACTIVE)
+        return cursor.fetchall()
 
     def cleanup_old(self, days: int = 7) -> int:
-        """Delete messages older than N days. Returns count deleted."""
+        """Delete messages older than N days. Returns count deleted.
+
+        Deletes in chunks, each its own transaction, so a large backlog
+        never holds the write lock long enough to stall the queue worker.
+        """
+        self.flush()
         conn = self._get_conn()
-        cursor = conn.execute(
-            """
-            DELETE FROM messages
-            WHERE created_at < datetime('now', ?)
-            """,
-            (f"-{days} days",)
-        )
-        conn.commit()
-        return cursor.rowcount
+        deleted = 0
+        while True:
+            cursor = conn.execute(_SQL_CLEANUP, (f"-{days} days", CLEANUP_CHUNK_SIZE))
+            deleted += cursor.rowcount
+            if cursor.rowcount < CLEANUP_CHUNK_SIZE:
+                break
+
+        if deleted:
+            self._bump()
+            # execute() only steps this pragma once, freeing a single page;
+            # executescript runs it to completion
+            conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES});")
+        return deleted
+
+    def flush(self) -> None:
+        """Wait until every write queued so far has been committed.
+
+        Returns at once when nothing is pending, the usual case for reads.
+        """
+        target = self._submitted
+        if self._written >= target:
+            return
+        with self._written_cond:
+            while self._written < target:
+                # Writes queued after the writer stopped would never land
+                if not self._writer.is_alive():
+                    raise RuntimeError("History writer thread is not running")
+                self._written_cond.wait(timeout=1.0)
+
+    def close(self) -> None:
+        """Commit pending writes, stop the writer thread and close connections.
+
+        Only the writer's connection and the calling thread's are closed;
+        other threads' connections are released when those threads exit.
+        Safe to call more than once.
+        """
+        with self._submit_lock:
+            if not self._closed:
+                self._closed = True
+                self._writes.put(None)
+        self._writer.join()
+        self._close_conn()
+
+    def _close_conn(self) -> None:
+        """Close the calling thread's connection, if it opened one."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            del self._local.conn
+
+    def _submit(self, write: _Write) -> None:
+        """Queue a write for the writer thread."""
+        # Sequence numbers must follow queue order for flush() to be exact
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("History store is closed")
+            seq = next(self._write_seq)
+            self._writes.put((seq, write))
+            self._submitted = seq
+        self._bump()
+
+    def _write_loop(self) -> None:
+        """Writer thread: apply queued writes in batches, one transaction each."""
+        while True:
+            item = self._writes.get()
+            batch = []
+            while item is not None:
+                batch.append(item)
+                if len(batch) == WRITE_BATCH_SIZE:
+                    break
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._apply(batch)
+            if item is None:
+                break
+        self._close_conn()
+
+    def _apply(self, batch: list[tuple[int, _Write]]) -> None:
+        """Commit a batch of writes, then mark it written even if some failed."""
+        try:
+            try:
+                with self._transaction() as conn:
+                    for _, write in batch:
+                        write(conn)
+            except Exception:
+                # Don't let one bad write take the rest of the batch with it
+                for _, write in batch:
+                    try:
+                        with self._transaction() as conn:
+                            write(conn)
+                    except Exception as e:
+                        print(f"History write failed: {e}", file=sys.stderr)
+        finally:
+            # Always advance, so flush() never waits on a batch that failed
+            with self._written_cond:
+                self._written = batch[-1][0]
+                self._written_cond.notify_all()
+
+    def _bump(self) -> None:
+        """Record that the stored messages changed."""
+        # next() on a count is atomic under the GIL, so concurrent writers
+        # never hand out the same version
+        self.version = next(self._versions)
@@ -0,0 +1,36 @@
+"""JSON encoding for SpeakUp, using orjson when it is installed."""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumps(obj, indent: bool = False, newline: bool = False, default=None) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes.
+
+    indent pretty-prints with two spaces; newline appends a trailing newline.
+    default converts objects that aren't natively serializable, as in
+    json.dumps.
+    """
+    if orjson is not None:
+        option = 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(obj, default=default, option=option)
+    data = json.dumps(obj, indent=2 if indent else None, default=default).encode()
+    return data + b"\n" if newline else data
+
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,7 +1,10 @@
 """Queue manager for serialized TTS playback."""
 
+import itertools
 import queue
 import threading
+import time
+from collections import deque
 from dataclasses import dataclass
 from typing import Optional
 
@@ -35,19 +38,37 @@ class QueueManager:
         self._tone_mapper = ToneMapper()
         self._player = StreamingPlayer()
 
-        self._queue: queue.Queue[SpeakRequest | None] = queue.Queue()
+        # Handlers append and the worker pops; deque ops are atomic under the
+        # GIL, so the only synchronization needed is waking the worker
+        self._queue: deque[SpeakRequest | None] = deque()
+        self._wake = threading.Event()
+        # Plain attribute stores are atomic under the GIL; _lock only guards
+        # the check-then-act sequences (starting the worker, clearing
+        # _current_request only if it is still the request we expect, and
+        # replacing the subscriber list)
         self._current_request: Optional[SpeakRequest] = None
         self._lock = threading.Lock()
-        self._running = False
+        self._running = threading.Event()
         self._worker_thread: Optional[threading.Thread] = None
+        # Announcement prefixes keyed by (announce, project); the project
+        # rarely changes, so each prefix is built once
+        self._prefix_cache: dict[tuple[str, str], str] = {}
+        # Queues of change notifications for event-stream clients. The list
+        # is replaced rather than mutated, so _notify can iterate it unlocked.
+        self._subscribers: list[queue.Queue] = []
+        # Bumped on every state change and reported by get_status(), so
+        # clients can skip redrawing an unchanged status. Seeded from the
+        # clock so versions keep increasing across service restarts.
+        self._versions = itertools.count(time.time_ns() // 1_000_000)
+        self._version = next(self._versions)
 
     def start(self) -> None:
         """Start the queue processing worker."""
         with self._lock:
-            if self._running:
+            if self._running.is_set():
                 return
 
-            self._running = True
+            self._running.set()
             self._worker_thread = threading.Thread(
                 target=self._process_queue,
                 daemon=True
@@ -56,77 +77,121 @@ class QueueManager:
 
     def stop(self) -> None:
         """Stop the queue manager."""
-        with self._lock:
-            self._running = False
+        self._running.clear()
 
-        self._queue.put(None)  # Signal worker to exit
+        self._queue.append(None)  # Signal worker to exit
+        self._wake.set()
 
         if self._worker_thread:
             self._worker_thread.join(timeout=2.0)
 
+        self._player.close()
+
     def enqueue(self, request: SpeakRequest) -> None:
         """Add a speak request to the queue."""
-        self._queue.put(request)
+        self._queue.append(request)
+        self._wake.set()
+        self._notify()
+
+    def subscribe(self) -> queue.Queue:
+        """Register for state-change notifications.
+
+        The returned queue receives an item whenever the queue or playback
+        state changes. It holds at most one pending item, so a slow reader
+        sees a burst of changes as a single notification and should re-read
+        get_status(). Call unsubscribe() when done.
+        """
+        subscriber: queue.Queue = queue.Queue(maxsize=1)
+        with self._lock:
+            self._subscribers = self._subscribers + [subscriber]
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        """Stop delivering notifications to a queue returned by subscribe()."""
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscriber]
 
     def stop_and_clear(self) -> int:
         """Stop current playback and clear queue. Returns count cleared."""
         # Stop current playback
         self._player.stop()
 
-        # Clear the queue and mark messages as skipped
-        cleared = 0
+        # Clear the queue, collecting IDs so they're marked skipped in one transaction
+        skipped_ids = []
         with self._lock:
             # Mark current as skipped if playing
             if self._current_request:
-                self._history.mark_skipped(self._current_request.message_id)
+                skipped_ids.append(self._current_request.message_id)
                 self._current_request = None
-                cleared += 1
 
         # Drain the queue
         while True:
             try:
-                req = self._queue.get_nowait()
-                if req is not None:
-                    self._history.mark_skipped(req.message_id)
-                    cleared += 1
-            except queue.Empty:
+                req = self._queue.popleft()
+            except IndexError:
                 break
+            if req is not None:
+                skipped_ids.append(req.message_id)
 
-        return cleared
+        self._history.mark_skipped_many(skipped_ids)
+        self._notify()
+        return len(skipped_ids)
 
     def get_status(self) -> dict:
         """Get current queue status."""
-        queued = []
+        # Read before the data, so a change made meanwhile bumps it past this
+        version = self._version
+
+        # Idle (the common case for a polling dashboard): nothing waiting in
+        # memory and nothing playing, so there's nothing to ask SQLite for
+        if not self._queue and self._current_request is None:
+            return {"playing": None, "queued": [], "queue_size": 0, "version": version}
+
         # Snapshot the queue (non-destructive peek isn't easy, so we use history)
-        queued_from_db = self._history.get_queued()
-        playing = self._history.get_playing()
+        playing = None
+        queued_from_db = []
+        for row in self._history.get_active():
+            if row["status"] == "playing":
+                if playing is None:
+                    playing = row
+            else:
+                queued_from_db.append(row)
 
         return {
             "playing": playing,
             "queued": queued_from_db,
             "queue_size": len(queued_from_db),
+            "version": version,
         }
 
     def _process_queue(self) -> None:
         """Worker thread that processes the queue."""
-        while self._running:
-            try:
-                request = self._queue.get(timeout=0.5)
-            except queue.Empty:
-                continue
+        while self._running.is_set():
+            # No timeout: enqueue() and stop() both set the event, so the
+            # worker sleeps until there is something to do
+            self._wake.wait()
+            # Clear before draining: anything enqueued after this point sets
+            # the event again, so it can't be missed
+            self._wake.clear()
 
-            if request is None:  # Shutdown signal
-                break
+            while self._running.is_set():
+                try:
+                    request = self._queue.popleft()
+                except IndexError:
+                    break
+
+                if request is None:  # Shutdown signal
+                    return
 
-            self._play_request(request)
+                self._play_request(request)
 
     def _play_request(self, request: SpeakRequest) -> None:
         """Play a single speak request."""
-        with self._lock:
-            self._current_request = request
+        self._current_request = request
 
         # Mark as playing in history
         self._history.mark_playing(request.message_id)
+        self._notify()
 
         # Build the full text with optional prefix
         full_text = self._build_text(request)
@@ -148,14 +213,29 @@ class QueueManager:
             if self._current_request and self._current_request.message_id == request.message_id:
                 self._history.mark_played(request.message_id, duration_ms)
                 self._current_request = None
+        self._notify()
 
     def _build_text(self, request: SpeakRequest) -> str:
         """Build full text with optional project announcement."""
         if request.announce == "none" or not request.project:
             return request.text
 
-        if request.announce == "full":
-            return f"This is Claude from {request.project}: {request.text}"
-
-        # Default: prefix
-        return f"{request.project}: {request.text}"
+        key = (request.announce, request.project)
+        prefix = self._prefix_cache.get(key)
+        if prefix is None:
+            if request.announce == "full":
+                prefix = f"This is Claude from {request.project}: "
+            else:
+                # Default: prefix
+                prefix = f"{request.project}: "
+            self._prefix_cache[key] = prefix
+        return prefix + request.text
+
+    def _notify(self) -> None:
+        """Record a status change and tell every subscriber about it."""
+        self._version = next(self._versions)
+        for subscriber in self._subscribers:
+            try:
+                subscriber.put_nowait(True)
+            except queue.Full:
+                pass  # A notification is already pending
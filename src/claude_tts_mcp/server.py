@@ -1,47 +1,37 @@
 """MCP Server for Claude TTS - thin client that talks to SpeakUp service."""
 
-import json
+import asyncio
+import functools
 import os
 import subprocess
 import sys
-import time
-from urllib.error import URLError
-from urllib.request import Request, urlopen
+from concurrent.futures import ThreadPoolExecutor
 
 from fastmcp import FastMCP
 
-from .service import DEFAULT_PORT, get_service_pid
+from .service_client import ServiceClient, wait_until
 
-SERVICE_URL = f"http://127.0.0.1:{DEFAULT_PORT}"
+# After a healthy probe, speak/stop calls within this window skip re-probing
+SERVICE_UP_TTL = 5.0
 
+# Keep-alive connection shared by every tool call in this process
+_client = ServiceClient(health_ttl=SERVICE_UP_TTL)
 
-def _api_call(endpoint: str, method: str = "GET", data: dict = None, timeout: float = 30) -> dict:
-    """Make API call to service."""
-    url = f"{SERVICE_URL}{endpoint}"
-    headers = {"Content-Type": "application/json"}
+# Tool calls block on HTTP (and on starting the service), so they run off the
+# event loop. One worker keeps speak requests reaching the service in order.
+_speak_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speakup-speak")
 
-    if data:
-        body = json.dumps(data).encode()
-        req = Request(url, data=body, headers=headers, method=method)
-    else:
-        req = Request(url, headers=headers, method=method)
 
-    try:
-        with urlopen(req, timeout=timeout) as response:
-            return json.loads(response.read())
-    except URLError as e:
-        return {"error": f"Service not reachable: {e}"}
-    except Exception as e:
-        return {"error": str(e)}
+def _api_call(endpoint: str, method: str = "GET", data: dict = None, timeout: float = 30) -> dict:
+    """Make API call to service."""
+    result = _client.request(endpoint, method=method, data=data, timeout=timeout)
+    result.pop("unreachable", None)
+    return result
 
 
 def _is_service_running() -> bool:
     """Check if service is running and responsive."""
-    try:
-        result = _api_call("/api/health", timeout=2)
-        return result.get("status") == "ok"
-    except Exception:
-        return False
+    return _client.is_running(timeout=2)
 
 
 def _start_service() -> bool:
@@ -57,13 +47,7 @@ def _start_service() -> bool:
         start_new_session=True,
     )
 
-    # Wait for it to start
-    for _ in range(40):  # 10 seconds max
-        time.sleep(0.25)
-        if _is_service_running():
-            return True
-
-    return False
+    return wait_until(_is_service_running, timeout=10)
 
 
 def _ensure_service() -> bool:
@@ -151,7 +135,7 @@ def create_server() -> FastMCP:
     mcp = FastMCP("claude-tts")
 
     @mcp.tool()
-    def speak_tool(
+    async def speak_tool(
         text: str,
         tone: str = "neutral",
         speed: float = 1.0,
@@ -168,16 +152,21 @@ def create_server() -> FastMCP:
         Returns:
             Dict with success status and duration_ms
         """
-        return speak(text=text, tone=tone, speed=speed, interrupt=interrupt)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _speak_executor,
+            functools.partial(speak, text=text, tone=tone, speed=speed, interrupt=interrupt),
+        )
 
     @mcp.tool()
-    def stop_tool() -> dict:
+    async def stop_tool() -> dict:
         """Stop any currently playing speech.
 
         Returns:
             Dict with success status
         """
-        return stop()
+        # Not on the speak worker, so a stop isn't stuck behind a queued speak
+        return await asyncio.get_running_loop().run_in_executor(None, stop)
 
     return mcp
 
@@ -1,21 +1,27 @@
 """HTTP service for centralized TTS playback."""
 
-import json
+import gzip
+import hashlib
 import os
+import queue
 import signal
 import sys
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from pathlib import Path
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable
 from urllib.parse import parse_qs, urlparse
 
+from . import json_codec
+from .config import DEFAULT_PORT, PID_FILE, get_service_pid
 from .history import HistoryStore
 from .queue_manager import QueueManager, SpeakRequest
 from .sherpa_engine import SherpaEngine
 from .voice_manager import VoiceManager
 
-DEFAULT_PORT = 7849
-PID_FILE = Path.home() / ".speakup" / "service.pid"
+# An idle event stream sends a comment this often (seconds) so a closed
+# browser tab is noticed and its handler thread exits
+EVENT_KEEPALIVE_INTERVAL = 15.0
 
 
 class TTSServiceHandler(BaseHTTPRequestHandler):
@@ -24,13 +30,30 @@ class TTSServiceHandler(BaseHTTPRequestHandler):
     queue_manager: QueueManager
     history: HistoryStore
 
+    # Keep connections open between requests. Every response carries a
+    # Content-Length, is chunked, or (the event stream) closes the connection.
+    protocol_version = "HTTP/1.1"
+    # Close kept-alive connections that have been idle this long (seconds)
+    timeout = 60
+
+    # Encoded /api/history body for one history version, shared by all
+    # handler threads: (version, body, gzipped body or None until needed)
+    _history_cache: tuple[int, bytes, bytes | None] | None = None
+
+    # Buffer the response so the status line, headers and a typical body go
+    # out in one send(); handle_one_request() flushes after each request
+    wbufsize = 64 * 1024
+    # Responses are small and latency-sensitive, so don't let Nagle hold them
+    disable_nagle_algorithm = True
+
     def log_message(self, format, *args):
         """Suppress default logging."""
         pass
 
     def _send_json(self, data: dict, status: int = 200) -> None:
         """Send JSON response."""
-        body = json.dumps(data).encode()
+        # History rows arrive as sqlite3.Row; default=dict converts them here
+        body = json_codec.dumps(data, default=dict)
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Content-Length", len(body))
@@ -38,25 +61,17 @@ class TTSServiceHandler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(body)
 
-    def _send_html(self, html: str, status: int = 200) -> None:
-        """Send HTML response."""
-        body = html.encode()
-        self.send_response(status)
-        self.send_header("Content-Type", "text/html; charset=utf-8")
-        self.send_header("Content-Length", len(body))
-        self.end_headers()
-        self.wfile.write(body)
-
     def do_OPTIONS(self):
         """Handle CORS preflight."""
-        self.send_response(200)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        self.wfile.write(_OPTIONS_RESPONSE)
 
     def do_GET(self):
         """Handle GET requests."""
+        # Health checks are the most frequent request and never vary
+        if self.path == "/api/health":
+            self.wfile.write(_HEALTH_RESPONSE)
+            return
+
         parsed = urlparse(self.path)
         path = parsed.path
 
@@ -65,11 +80,14 @@ class TTSServiceHandler(BaseHTTPRequestHandler):
         elif path == "/api/status":
             self._get_status()
         elif path == "/api/history":
-            self._get_history()
+            self._get_history(parse_qs(parsed.query))
+        elif path == "/api/events":
+            self._stream_events()
         elif path == "/api/health":
-            self._send_json({"status": "ok"})
+            # Probes with a query string (e.g. cache-busting) miss the fast path
+            self.wfile.write(_HEALTH_RESPONSE)
         else:
-            self._send_json({"error": "Not found"}, 404)
+            self.wfile.write(_NOT_FOUND_RESPONSE)
 
     def do_POST(self):
         """Handle POST requests."""
@@ -78,20 +96,115 @@ class TTSServiceHandler(BaseHTTPRequestHandler):
 
         if path == "/api/speak":
             self._post_speak()
-        elif path == "/api/stop":
+            return
+
+        # Nothing else reads the body, but it has to be consumed so the next
+        # request on this connection starts where expected
+        self._discard_body()
+        if path == "/api/stop":
             self._post_stop()
         else:
-            self._send_json({"error": "Not found"}, 404)
+            self.wfile.write(_NOT_FOUND_RESPONSE)
+
+    def _discard_body(self) -> None:
+        """Read and drop the request body, if any."""
+        content_length = int(self.headers.get("Content-Length", 0))
+        if content_length:
+            self.rfile.read(content_length)
 
     def _get_status(self) -> None:
         """Get queue status."""
         status = self.queue_manager.get_status()
         self._send_json(status)
 
-    def _get_history(self) -> None:
-        """Get message history."""
-        messages = self.history.get_recent(100)
-        self._send_json({"messages": messages})
+    def _stream_events(self) -> None:
+        """Push the queue status as server-sent events whenever it changes.
+
+        Sends the current status immediately, then again after each change
+        reported by QueueManager. The connection stays open until the client
+        goes away.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        # The stream has no length, so it ends when the connection does
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        changes = self.queue_manager.subscribe()
+        try:
+            while True:
+                status = self.queue_manager.get_status()
+                self.wfile.write(b"data: %s\n\n" % json_codec.dumps(status, default=dict))
+                self.wfile.flush()
+                while True:
+                    try:
+                        changes.get(timeout=EVENT_KEEPALIVE_INTERVAL)
+                        break
+                    except queue.Empty:
+                        self.wfile.write(b": keepalive\n\n")
+                        self.wfile.flush()
+        except OSError:
+            pass  # Client disconnected
+        finally:
+            self.queue_manager.unsubscribe(changes)
+
+    def _get_history(self, query: dict) -> None:
+        """Get message history.
+
+        A client passing ?since=<version> from its last response gets
+        {"version": ..., "unchanged": true} without a query when nothing
+        has been written since. The body is otherwise encoded (and gzipped,
+        for clients that accept it) once per history version, and tagged
+        with the version so a revalidating client gets a 304.
+        """
+        # Read before the rows, so a write made meanwhile bumps it past this
+        version = self.history.version
+        if query.get("since") == [str(version)]:
+            self._send_json({"version": version, "unchanged": True})
+            return
+
+        # The version identifies the content, so it doubles as the ETag
+        etag = f'"{version}"'
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        cached = TTSServiceHandler._history_cache
+        if cached is None or cached[0] != version:
+            cached = (version, self._encode_history(version), None)
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        if use_gzip and cached[2] is None:
+            cached = (version, cached[1], gzip.compress(cached[1], 1))
+        # A plain store; concurrent threads at worst encode the same version twice
+        TTSServiceHandler._history_cache = cached
+        body = cached[2] if use_gzip else cached[1]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", len(body))
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache, must-revalidate")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _encode_history(self, version: int) -> bytes:
+        """Encode recent history, one row at a time straight from the cursor."""
+        buf = bytearray(b'{"version":%d,"messages":[' % version)
+        sep = b""
+        for row in self.history.iter_recent(100):
+            buf += sep
+            buf += json_codec.dumps(row, default=dict)
+            sep = b","
+        buf += b"]}"
+        return bytes(buf)
 
     def _post_speak(self) -> None:
         """Handle speak request."""
@@ -99,8 +212,8 @@ class TTSServiceHandler(BaseHTTPRequestHandler):
         body = self.rfile.read(content_length)
 
         try:
-            data = json.loads(body)
-        except json.JSONDecodeError:
+            data = json_codec.loads(body)
+        except json_codec.JSONDecodeError:
             self._send_json({"error": "Invalid JSON"}, 400)
             return
 
@@ -144,9 +257,53 @@ class TTSServiceHandler(BaseHTTPRequestHandler):
         })
 
     def _serve_ui(self) -> None:
-        """Serve the web UI."""
-        html = WEB_UI_HTML
-        self._send_html(html)
+        """Serve the web UI from the bytes prepared at import.
+
+        The browser revalidates on each load and gets a bodyless 304 while
+        the page is unchanged.
+        """
+        if _UI_ETAG in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", _UI_ETAG)
+            self.end_headers()
+            return
+
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        body = _UI_GZIP if use_gzip else _UI_BYTES
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", len(body))
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", _UI_ETAG)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _prebuilt_response(status: int, body: bytes = b"", headers: Iterable[str] = ()) -> bytes:
+    """Render a complete response (status line, headers and body) to bytes.
+
+    For responses that never change, so handlers can send them with one
+    write instead of formatting them on every request.
+    """
+    lines = [
+        f"{TTSServiceHandler.protocol_version} {status} {HTTPStatus(status).phrase}",
+        *headers,
+        f"Content-Length: {len(body)}",
+    ]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+
+_JSON_HEADERS = ("Content-Type: application/json", "Access-Control-Allow-Origin: *")
+_HEALTH_RESPONSE = _prebuilt_response(200, json_codec.dumps({"status": "ok"}), _JSON_HEADERS)
+_NOT_FOUND_RESPONSE = _prebuilt_response(404, json_codec.dumps({"error": "Not found"}), _JSON_HEADERS)
+_OPTIONS_RESPONSE = _prebuilt_response(200, headers=(
+    "Access-Control-Allow-Origin: *",
+    "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers: Content-Type",
+))
 
 
 WEB_UI_HTML = """<!DOCTYPE html>
@@ -338,14 +495,23 @@ WEB_UI_HTML = """<!DOCTYPE html>
         let activeProjectFilter = null;
         let allProjects = new Set();
         let lastHistoryMessages = [];
+        // Versions of the last status/history rendered; unchanged data is skipped
+        let lastStatusVersion = null;
+        let lastHistoryVersion = null;
+        let lastPlayingKey = null;
+
+        function applyStatus(data) {
+            if (data.version === lastStatusVersion) return;
+            lastStatusVersion = data.version;
+            updatePlaying(data.playing);
+            updateQueue(data.queued);
+            document.getElementById('queue-count').textContent = data.queue_size;
+        }
 
         async function fetchStatus() {
             try {
                 const res = await fetch('/api/status');
-                const data = await res.json();
-                updatePlaying(data.playing);
-                updateQueue(data.queued);
-                document.getElementById('queue-count').textContent = data.queue_size;
+                applyStatus(await res.json());
             } catch (e) {
                 console.error('Failed to fetch status:', e);
             }
@@ -353,8 +519,11 @@ WEB_UI_HTML = """<!DOCTYPE html>
 
         async function fetchHistory() {
             try {
-                const res = await fetch('/api/history');
+                const since = lastHistoryVersion === null ? '' : '?since=' + lastHistoryVersion;
+                const res = await fetch('/api/history' + since);
                 const data = await res.json();
+                if (data.unchanged) return;
+                lastHistoryVersion = data.version;
                 lastHistoryMessages = data.messages;
                 updateFilterBar(data.messages);
                 updateHistory(data.messages);
@@ -405,8 +574,44 @@ WEB_UI_HTML = """<!DOCTYPE html>
             updateHistory(lastHistoryMessages);
         }
 
+        // Render items into el, keyed by message id and status. Nodes for
+        // items already shown are kept (with their expanded state) and only
+        // added, removed or moved as needed.
+        function syncList(el, items, prefix, render) {
+            const existing = new Map();
+            for (const node of Array.from(el.children)) {
+                if (node.dataset.key) {
+                    existing.set(node.dataset.key, node);
+                } else {
+                    node.remove();  // Empty-state placeholder
+                }
+            }
+            const nodes = items.map(m => {
+                const key = prefix + m.id + ':' + m.status;
+                let node = existing.get(key);
+                if (node) {
+                    existing.delete(key);
+                } else {
+                    const tpl = document.createElement('template');
+                    tpl.innerHTML = render(m).trim();
+                    node = tpl.content.firstElementChild;
+                    node.dataset.key = key;
+                }
+                return node;
+            });
+            existing.forEach(node => node.remove());
+            nodes.forEach((node, i) => {
+                if (el.children[i] !== node) {
+                    el.insertBefore(node, el.children[i] || null);
+                }
+            });
+        }
+
         function updatePlaying(playing) {
             const el = document.getElementById('now-playing');
+            const key = playing ? playing.id : null;
+            if (key === lastPlayingKey) return;
+            lastPlayingKey = key;
             if (playing) {
                 el.className = 'now-playing';
                 const msgId = 'playing-' + playing.id;
@@ -426,7 +631,7 @@ WEB_UI_HTML = """<!DOCTYPE html>
                 el.innerHTML = '<div class="empty-state">Queue is empty</div>';
                 return;
             }
-            el.innerHTML = queued.map(m => {
+            syncList(el, queued, 'queue-', m => {
                 const msgId = 'queue-' + m.id;
                 const isExpanded = expandedMessages.has(msgId);
                 const textClass = isExpanded ? 'expanded' : (m.text.length > 80 ? 'truncated' : '');
@@ -435,7 +640,7 @@ WEB_UI_HTML = """<!DOCTYPE html>
                     <span class="message-project">${esc(m.project)}</span>
                     <div class="message-text ${textClass}" data-msg-id="${msgId}" onclick="toggleExpand(this)">${esc(m.text)}</div>
                 </div>
-            `}).join('');
+            `});
         }
 
         function updateHistory(messages) {
@@ -452,7 +657,7 @@ WEB_UI_HTML = """<!DOCTYPE html>
                 el.innerHTML = `<div class="empty-state">No history${filterNote}</div>`;
                 return;
             }
-            el.innerHTML = played.slice(0, 20).map(m => {
+            syncList(el, played.slice(0, 20), 'history-', m => {
                 const msgId = 'history-' + m.id;
                 const isExpanded = expandedMessages.has(msgId);
                 const textClass = isExpanded ? 'expanded' : (m.text.length > 80 ? 'truncated' : '');
@@ -463,7 +668,7 @@ WEB_UI_HTML = """<!DOCTYPE html>
                     <div class="message-text ${textClass}" data-msg-id="${msgId}" onclick="toggleExpand(this)">${esc(m.text)}</div>
                     <div class="message-meta">${formatTime(m.created_at)}</div>
                 </div>
-            `}).join('');
+            `});
         }
 
         function toggleExpand(el) {
@@ -502,16 +707,24 @@ WEB_UI_HTML = """<!DOCTYPE html>
             return d.toLocaleTimeString();
         }
 
-        // Poll for updates
-        fetchStatus();
-        fetchHistory();
-        setInterval(fetchStatus, 1000);
-        setInterval(fetchHistory, 3000);
+        // The service pushes the status whenever it changes; history only
+        // changes along with it, so refresh it on the same events.
+        // EventSource reconnects by itself if the service restarts.
+        const events = new EventSource('/api/events');
+        events.onmessage = (e) => {
+            applyStatus(JSON.parse(e.data));
+            fetchHistory();
+        };
     </script>
 </body>
 </html>
 """
 
+# The page never changes at runtime: encode, compress and fingerprint it once
+_UI_BYTES = WEB_UI_HTML.encode()
+_UI_GZIP = gzip.compress(_UI_BYTES, 9, mtime=0)
+_UI_ETAG = '"' + hashlib.md5(_UI_BYTES, usedforsecurity=False).hexdigest() + '"'
+
 
 def write_pid_file() -> None:
     """Write PID file for service discovery."""
@@ -527,17 +740,6 @@ def remove_pid_file() -> None:
         pass
 
 
-def get_service_pid() -> Optional[int]:
-    """Get PID of running service, or None if not running."""
-    try:
-        pid = int(PID_FILE.read_text().strip())
-        # Check if process is actually running
-        os.kill(pid, 0)
-        return pid
-    except (FileNotFoundError, ValueError, ProcessLookupError, PermissionError):
-        return None
-
-
 def run_service(port: int = DEFAULT_PORT) -> None:
     """Run the TTS service."""
     # Check if already running
@@ -555,13 +757,19 @@ def run_service(port: int = DEFAULT_PORT) -> None:
         sys.exit(1)
 
     paths = voice_manager.get_voice_paths(voice_name)
-    engine = SherpaEngine(
-        model_path=str(paths["model"]),
-        tokens_path=str(paths["tokens"]),
-        data_dir=str(paths["data_dir"]),
-    )
 
-    history = HistoryStore()
+    # Loading the ONNX model dominates startup and runs in native code, so
+    # open the history database while it loads
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        engine_future = pool.submit(
+            SherpaEngine,
+            model_path=str(paths["model"]),
+            tokens_path=str(paths["tokens"]),
+            data_dir=str(paths["data_dir"]),
+        )
+        history = HistoryStore()
+        engine = engine_future.result()
+
     queue_manager = QueueManager(engine, history)
 
     # Attach to handler class
@@ -578,20 +786,25 @@ def run_service(port: int = DEFAULT_PORT) -> None:
     def shutdown(signum, frame):
         print("\nShutting down...")
         queue_manager.stop()
+        history.close()
         remove_pid_file()
         sys.exit(0)
 
     signal.signal(signal.SIGINT, shutdown)
     signal.signal(signal.SIGTERM, shutdown)
 
-    # Start HTTP server
-    server = HTTPServer(("127.0.0.1", port), TTSServiceHandler)
+    # Start HTTP server. One thread per connection so UI polls, CLI calls and
+    # speak requests don't queue behind each other; handler threads are
+    # daemons so they never hold up shutdown.
+    server = ThreadingHTTPServer(("127.0.0.1", port), TTSServiceHandler)
+    server.daemon_threads = True
     print(f"SpeakUp service running on http://127.0.0.1:{port}")
 
     try:
         server.serve_forever()
     finally:
         queue_manager.stop()
+        history.close()
         remove_pid_file()
 
 
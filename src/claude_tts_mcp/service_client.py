@@ -0,0 +1,133 @@
+"""Keep-alive HTTP client for the SpeakUp service API.
+
+Shared by the CLI and the MCP thin client so repeated calls to the local
+service reuse one TCP connection instead of reconnecting every time.
+"""
+
+import http.client
+import threading
+import time
+
+from . import json_codec
+from .config import DEFAULT_PORT
+
+# Errors that mean the service closed an idle keep-alive connection before
+# answering. They are only retried when raised before any response bytes
+# arrive; a timeout is never retried, since the request may already be
+# queued and sending it again would speak twice.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class ServiceClient:
+    """JSON client holding one persistent connection to the service.
+
+    A healthy is_running() probe is trusted for health_ttl seconds so
+    back-to-back checks skip the round-trip. Only positive results are
+    cached, and any unreachable request drops the cache.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, health_ttl: float = 0.0):
+        self._host = host
+        self._port = port
+        self._health_ttl = health_ttl
+        self._up_until = 0.0
+        self._conn: http.client.HTTPConnection | None = None
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        data: dict = None,
+        timeout: float = 30,
+    ) -> dict:
+        """Call an API endpoint and return the decoded JSON response.
+
+        Connection failures are returned as {"error": ..., "unreachable": True}
+        rather than raised. A reused connection that the service had already
+        closed is retried once on a fresh one.
+        """
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        body = json_codec.dumps(data) if data else None
+
+        with self._lock:
+            for attempt in range(2):
+                reused = self._conn is not None and self._conn.sock is not None
+                if self._conn is None:
+                    self._conn = http.client.HTTPConnection(self._host, self._port, timeout=timeout)
+                self._conn.timeout = timeout
+                if self._conn.sock is not None:
+                    self._conn.sock.settimeout(timeout)
+                try:
+                    self._conn.request(method, endpoint, body=body, headers=headers)
+                    response = self._conn.getresponse()
+                except _STALE_CONNECTION_ERRORS as e:
+                    self._close()
+                    if reused and not attempt:
+                        continue
+                    return self._unreachable(e)
+                except (http.client.HTTPException, OSError) as e:
+                    return self._unreachable(e)
+
+                # Part of a response has arrived, so never retry from here
+                try:
+                    payload = response.read()
+                except (http.client.HTTPException, OSError) as e:
+                    return self._unreachable(e)
+                break
+
+        try:
+            return json_codec.loads(payload)
+        except ValueError:
+            return {"error": f"Invalid response from service (HTTP {response.status})"}
+
+    def is_running(self, timeout: float = 2) -> bool:
+        """Check if the service is running and responsive."""
+        if time.monotonic() < self._up_until:
+            return True
+        running = self.request("/api/health", timeout=timeout).get("status") == "ok"
+        if running:
+            self._up_until = time.monotonic() + self._health_ttl
+        return running
+
+    def forget_health(self) -> None:
+        """Drop the cached healthy state so the next check probes again."""
+        self._up_until = 0.0
+
+    def close(self) -> None:
+        """Drop the connection so the next request reconnects."""
+        with self._lock:
+            self._close()
+
+    def _unreachable(self, error: Exception) -> dict:
+        self._close()
+        # Notice a crashed service on the next check instead of trusting the cache
+        self._up_until = 0.0
+        return {"error": f"Service not reachable: {error}", "unreachable": True}
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    """Poll condition with exponential backoff until it holds or timeout passes.
+
+    Starts at 10ms so a fast start/stop is noticed almost immediately, and
+    backs off to 200ms so a slow one doesn't spin.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while True:
+        if condition():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.2)
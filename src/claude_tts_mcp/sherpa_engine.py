@@ -1,5 +1,6 @@
 """Sherpa-onnx TTS engine wrapper."""
 
+import os
 from typing import Callable
 import numpy as np
 import sherpa_onnx
@@ -8,6 +9,19 @@ from .tone_mapper import ToneParams
 
 AudioCallback = Callable[[np.ndarray], bool]
 
+# ONNX Runtime intra-op threads used when neither the constructor nor
+# SPEAKUP_TTS_THREADS says otherwise. Half the cores, capped because a
+# small VITS model stops scaling after a few threads.
+MAX_DEFAULT_THREADS = 4
+
+
+def _default_num_threads() -> int:
+    """Thread count from SPEAKUP_TTS_THREADS, else half the cores (at most 4)."""
+    env = os.environ.get("SPEAKUP_TTS_THREADS", "")
+    if env.isdigit() and int(env) > 0:
+        return int(env)
+    return max(1, min(MAX_DEFAULT_THREADS, (os.cpu_count() or 2) // 2))
+
 
 class SherpaEngine:
     """Wraps sherpa-onnx for TTS synthesis."""
@@ -18,6 +32,8 @@ class SherpaEngine:
         tokens_path: str,
         data_dir: str = "",
         lexicon_path: str = "",
+        num_threads: int | None = None,
+        provider: str | None = None,
     ):
         """Initialize the TTS engine.
 
@@ -26,7 +42,15 @@ class SherpaEngine:
             tokens_path: Path to the tokens.txt file
             data_dir: Path to espeak-ng-data directory (for phonemization)
             lexicon_path: Path to lexicon file (optional)
+            num_threads: Inference threads (default: SPEAKUP_TTS_THREADS,
+                         else half the CPU cores, at most 4)
+            provider: ONNX Runtime execution provider, e.g. "coreml"
+                      (default: SPEAKUP_TTS_PROVIDER, else "cpu"). Falls
+                      back to "cpu" if the provider fails to load.
         """
+        self._num_threads = num_threads or _default_num_threads()
+        provider = provider or os.environ.get("SPEAKUP_TTS_PROVIDER", "cpu")
+
         # Create VITS model config
         vits_config = sherpa_onnx.OfflineTtsVitsModelConfig(
             model=model_path,
@@ -35,20 +59,29 @@ class SherpaEngine:
             data_dir=data_dir,
         )
 
+        try:
+            self._tts = self._create_tts(vits_config, provider)
+        except Exception:
+            if provider == "cpu":
+                raise
+            self._tts = self._create_tts(vits_config, "cpu")
+        self._loaded = self._tts is not None
+
+    def _create_tts(self, vits_config, provider: str):
+        """Build the sherpa-onnx TTS instance for an execution provider."""
         # Create model config
         model_config = sherpa_onnx.OfflineTtsModelConfig(
             vits=vits_config,
-            num_threads=1,
+            num_threads=self._num_threads,
             debug=False,
-            provider="cpu",
+            provider=provider,
         )
 
         # Create TTS config
         tts_config = sherpa_onnx.OfflineTtsConfig(model=model_config)
 
         # Create TTS instance
-        self._tts = sherpa_onnx.OfflineTts(tts_config)
-        self._loaded = self._tts is not None
+        return sherpa_onnx.OfflineTts(tts_config)
 
     def synthesize_streaming(
         self, text: str, params: ToneParams, callback: AudioCallback
@@ -59,7 +92,9 @@ class SherpaEngine:
             text: Text to synthesize
             params: Tone parameters for synthesis
             callback: Called with audio chunks as they're generated.
-                      Return True to continue, False to stop.
+                      Return True to continue, False to stop. Each chunk is
+                      passed without copying when sherpa-onnx already hands
+                      over contiguous float32 samples.
         """
         if not text.strip():
             return
@@ -67,7 +102,8 @@ class SherpaEngine:
         speed = 1.0 / params.length_scale
 
         def sherpa_callback(samples: np.ndarray, progress: float) -> int:
-            samples_float = np.array(samples, dtype=np.float32)
+            # Only copies when the dtype or memory layout has to change
+            samples_float = np.ascontiguousarray(samples, dtype=np.float32)
             should_continue = callback(samples_float)
             return 1 if should_continue else 0
 
@@ -88,7 +124,7 @@ class SherpaEngine:
 
         speed = 1.0 / params.length_scale
         audio = self._tts.generate(text=text, sid=0, speed=speed)
-        samples = np.array(audio.samples, dtype=np.float32)
+        samples = np.asarray(audio.samples, dtype=np.float32)
         return samples, self.sample_rate
 
     @property
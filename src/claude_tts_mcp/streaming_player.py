@@ -1,13 +1,124 @@
 """Streaming audio player using sounddevice."""
 
-import queue
+import ctypes
+import sys
 import threading
+import time
+from typing import Callable
+
 import numpy as np
 import sounddevice as sd
 
 
+# Capacity of the ring buffer between synthesis and playback, in seconds
+# of audio at the current sample rate
+RING_SECONDS = 2.0
+
+# Upper bound on the output latency requested from a device, in seconds.
+# Some Bluetooth sinks report defaults of several seconds.
+MAX_OUTPUT_LATENCY = 0.1
+
+# Seconds an idle output stream stays open before it is closed
+IDLE_CLOSE_SECONDS = 30.0
+
+# Minimum seconds between system_profiler checks when the CoreAudio
+# listener is unavailable
+SYSTEM_DEFAULT_CHECK_INTERVAL = 10.0
+
+# Bytes per float32 sample in the raw output buffer
+_SAMPLE_BYTES = 4
+
 # Track the last used device to detect changes
 _last_device_name: str | None = None
+# System default seen at the last check, so a name that PortAudio reports
+# differently doesn't force a reload on every playback
+_last_system_default: str | None = None
+# time.monotonic() of the last system_profiler check, None before the first
+_last_system_check: float | None = None
+
+# Set by the CoreAudio listener when the system default output changes.
+# Starts True so the first playback refreshes the device list once.
+_default_changed = True
+# None until installation is attempted, then whether the listener is active
+_listener_installed: bool | None = None
+# Keeps the ctypes callback alive for as long as CoreAudio may call it
+_listener_ref = None
+
+# CoreAudio constants (four-char codes)
+_kAudioObjectSystemObject = 1
+_kAudioHardwarePropertyDefaultOutputDevice = 0x644F7574  # 'dOut'
+_kAudioHardwarePropertyRunLoop = 0x726E6C70  # 'rnlp'
+_kAudioObjectPropertyScopeGlobal = 0x676C6F62  # 'glob'
+_kAudioObjectPropertyElementMain = 0
+
+
+class _AudioObjectPropertyAddress(ctypes.Structure):
+    _fields_ = [
+        ("mSelector", ctypes.c_uint32),
+        ("mScope", ctypes.c_uint32),
+        ("mElement", ctypes.c_uint32),
+    ]
+
+
+_AudioObjectPropertyListenerProc = ctypes.CFUNCTYPE(
+    ctypes.c_int32,
+    ctypes.c_uint32,
+    ctypes.c_uint32,
+    ctypes.POINTER(_AudioObjectPropertyAddress),
+    ctypes.c_void_p,
+)
+
+
+def _on_default_output_changed(object_id, num_addresses, addresses, client_data) -> int:
+    global _default_changed
+    _default_changed = True
+    return 0
+
+
+def _install_default_device_listener() -> bool:
+    """Ask CoreAudio to report default output changes. Returns success.
+
+    Only available on macOS; elsewhere (or if any call fails) the caller
+    falls back to polling.
+    """
+    global _listener_ref
+    if sys.platform != "darwin":
+        return False
+    try:
+        core_audio = ctypes.CDLL("/System/Library/Frameworks/CoreAudio.framework/CoreAudio")
+
+        # Deliver notifications on CoreAudio's own thread rather than the
+        # main run loop, which this process never runs
+        run_loop_address = _AudioObjectPropertyAddress(
+            _kAudioHardwarePropertyRunLoop,
+            _kAudioObjectPropertyScopeGlobal,
+            _kAudioObjectPropertyElementMain,
+        )
+        no_run_loop = ctypes.c_void_p(None)
+        core_audio.AudioObjectSetPropertyData(
+            _kAudioObjectSystemObject,
+            ctypes.byref(run_loop_address),
+            0,
+            None,
+            ctypes.sizeof(no_run_loop),
+            ctypes.byref(no_run_loop),
+        )
+
+        address = _AudioObjectPropertyAddress(
+            _kAudioHardwarePropertyDefaultOutputDevice,
+            _kAudioObjectPropertyScopeGlobal,
+            _kAudioObjectPropertyElementMain,
+        )
+        listener = _AudioObjectPropertyListenerProc(_on_default_output_changed)
+        status = core_audio.AudioObjectAddPropertyListener(
+            _kAudioObjectSystemObject, ctypes.byref(address), listener, None
+        )
+    except (OSError, AttributeError):
+        return False
+    if status != 0:
+        return False
+    _listener_ref = listener
+    return True
 
 
 def get_current_output_device() -> tuple[int, str]:
@@ -19,6 +130,8 @@ def get_current_output_device() -> tuple[int, str]:
 
 def get_system_default_output() -> str | None:
     """Query macOS for the actual system default output device name."""
+    if sys.platform != "darwin":
+        return None
     import subprocess
     try:
         # Use system_profiler to get current audio output
@@ -41,13 +154,44 @@ def get_system_default_output() -> str | None:
     return None
 
 
-def get_output_device_with_refresh() -> tuple[int, str]:
+def get_output_device_with_refresh(
+    before_refresh: Callable[[], None] | None = None,
+) -> tuple[int, str]:
     """Get output device, refreshing device list if system default changed.
 
-    This checks the actual macOS system default and refreshes sounddevice's
-    cached device list when a new device is plugged in (like headphones).
+    On macOS a CoreAudio listener flags default-device changes, so the
+    device list is only reloaded after one (like headphones being plugged
+    in) and no work is done otherwise. Where the listener is unavailable,
+    this compares against the system default reported by system_profiler,
+    checked at most every SYSTEM_DEFAULT_CHECK_INTERVAL seconds.
+
+    Reloading the list closes every open PortAudio stream, so callers that
+    keep a stream open pass before_refresh to close it first.
     """
-    global _last_device_name
+    global _last_device_name, _last_system_default, _last_system_check
+    global _default_changed, _listener_installed
+
+    if _listener_installed is None:
+        _listener_installed = _install_default_device_listener()
+
+    if _listener_installed:
+        if _default_changed:
+            _default_changed = False
+            try:
+                if before_refresh is not None:
+                    before_refresh()
+                sd._terminate()
+                sd._initialize()
+            except Exception:
+                pass
+        try:
+            current_idx, current_name = get_current_output_device()
+        except Exception:
+            # Let PortAudio pick the default, and reload the list next time
+            _default_changed = True
+            return None, None
+        _last_device_name = current_name
+        return current_idx, current_name
 
     # First, get what sounddevice currently thinks is the default
     try:
@@ -56,18 +200,32 @@ def get_output_device_with_refresh() -> tuple[int, str]:
         current_name = None
         current_idx = None
 
-    # Check the actual macOS system default
-    system_default = get_system_default_output()
-
-    # Refresh if: first call, sounddevice name changed, OR system default differs
+    # Check the actual macOS system default, at most once per interval since
+    # system_profiler takes a noticeable fraction of a second
+    now = time.monotonic()
+    if (
+        _last_system_check is None
+        or now - _last_system_check >= SYSTEM_DEFAULT_CHECK_INTERVAL
+    ):
+        _last_system_check = now
+        system_default = get_system_default_output()
+    else:
+        system_default = _last_system_default
+
+    # Refresh if: first call, sounddevice name changed, OR system default
+    # changed since the last check and differs from what sounddevice reports
     needs_refresh = (
         _last_device_name is None or
         current_name != _last_device_name or
-        (system_default and system_default != current_name)
+        (system_default and system_default != current_name
+         and system_default != _last_system_default)
     )
+    _last_system_default = system_default
 
     if needs_refresh:
         try:
+            if before_refresh is not None:
+                before_refresh()
             sd._terminate()
             sd._initialize()
             current_idx, current_name = get_current_output_device()
@@ -78,18 +236,57 @@ def get_output_device_with_refresh() -> tuple[int, str]:
     return current_idx, current_name
 
 
+def _output_latency(device: int | None) -> float | str:
+    """Low-latency default for an output device, capped at MAX_OUTPUT_LATENCY."""
+    try:
+        info = sd.query_devices(device, "output")
+        return min(info["default_low_output_latency"], MAX_OUTPUT_LATENCY)
+    except Exception:
+        return "low"
+
+
 class StreamingPlayer:
-    """Streams audio chunks to output as they arrive."""
+    """Streams audio chunks to output as they arrive.
+
+    Synthesis feeds samples into a preallocated float32 ring buffer, and
+    PortAudio's callback copies them straight from the ring into the
+    device buffer, so chunks are copied once, nothing is allocated per
+    chunk, and there is no writer thread. When the ring is full, feed()
+    waits for playback to make room.
+
+    The output stream stays open between messages and is only reopened
+    when the sample rate or output device changes. It is closed after
+    IDLE_CLOSE_SECONDS without playback, or by close() when the player is
+    no longer needed.
+    """
 
     def __init__(self):
-        self._stream: sd.OutputStream | None = None
-        self._queue: queue.Queue[np.ndarray | None] = queue.Queue()
+        self._stream: sd.RawOutputStream | None = None
+        # (sample_rate, device) the open stream was created for
+        self._stream_key: tuple[int, int | None] | None = None
+        self._sample_rate = 22050
+        self._ring = np.empty(int(self._sample_rate * RING_SECONDS), dtype=np.float32)
+        # Total samples ever written to / read from the ring; their
+        # difference is what is waiting to be played
+        self._write_pos = 0
+        self._read_pos = 0
+        # Signalled whenever the positions or the flags below change
+        self._ring_cond = threading.Condition()
+        self._finished = False
+        # Bumped by start() and stop(), so a feed() that started before
+        # either can't publish samples into the ring afterwards
+        self._generation = 0
+        # Set by PortAudio once the stream has stopped and played out
+        self._drained = threading.Event()
+        # Zeros copied into the device buffer when the ring runs dry
+        self._silence = bytes(0)
         self._playing = False
         self._interrupted = False
         self._lock = threading.Lock()
-        self._playback_thread: threading.Thread | None = None
         self._total_samples = 0
-        self._sample_rate = 22050
+        self._stream_stopped = False
+        # Closes the stream once it has been idle; replaced on every cleanup
+        self._idle_timer: threading.Timer | None = None
 
     def start(self, sample_rate: int) -> None:
         """Start the audio stream for receiving chunks.
@@ -102,26 +299,48 @@ class StreamingPlayer:
                 self.stop()
 
             self._sample_rate = sample_rate
-            self._queue = queue.Queue()
-            self._interrupted = False
+            ring_size = int(sample_rate * RING_SECONDS)
+            if len(self._ring) != ring_size:
+                self._ring = np.empty(ring_size, dtype=np.float32)
+            with self._ring_cond:
+                self._generation += 1
+                self._write_pos = 0
+                self._read_pos = 0
+                self._finished = False
+                self._interrupted = False
             self._total_samples = 0
             self._playing = True
+            self._cancel_idle_timer()
 
             # Get output device, only refreshing if device changed
             # This avoids killing streams that might still be flushing
-            default_device, device_name = get_output_device_with_refresh()
-
-            self._stream = sd.OutputStream(
-                samplerate=sample_rate,
-                channels=1,
-                dtype=np.float32,
-                blocksize=1024,
-                device=default_device,
+            default_device, device_name = get_output_device_with_refresh(
+                before_refresh=self._close_stream
             )
-            self._stream.start()
 
-            self._playback_thread = threading.Thread(target=self._playback_loop)
-            self._playback_thread.start()
+            # Reuse the open stream unless it no longer matches
+            key = (sample_rate, default_device)
+            if self._stream is not None and self._stream_key != key:
+                self._close_stream()
+            if self._stream is None:
+                # blocksize=0 lets the host pick the buffer size per callback,
+                # sized for the device's own low-latency default
+                self._stream = sd.RawOutputStream(
+                    samplerate=sample_rate,
+                    channels=1,
+                    dtype="float32",
+                    blocksize=0,
+                    latency=_output_latency(default_device),
+                    device=default_device,
+                    callback=self._pa_callback,
+                    finished_callback=self._drained.set,
+                )
+                self._stream_key = key
+                self._stream_stopped = True
+            if self._stream_stopped:
+                self._drained.clear()
+                self._stream.start()
+                self._stream_stopped = False
 
     def feed(self, samples: np.ndarray) -> bool:
         """Feed audio samples to the player.
@@ -132,13 +351,46 @@ class StreamingPlayer:
         Returns:
             True to continue receiving samples, False if interrupted
         """
+        generation = self._generation
         if self._interrupted:
             return False
 
-        if len(samples) > 0:
-            self._queue.put(samples)
-            with self._lock:
-                self._total_samples += len(samples)
+        total = len(samples)
+        if total > 0:
+            # Only the producer updates this, and finish() reads it after
+            # the producer is done, so it needs no lock
+            self._total_samples += total
+
+            ring = self._ring
+            size = len(ring)
+            offset = 0
+            while offset < total:
+                with self._ring_cond:
+                    self._ring_cond.wait_for(
+                        lambda: self._generation != generation
+                        or self._write_pos - self._read_pos < size
+                    )
+                    if self._generation != generation:
+                        return False
+                    write_pos = self._write_pos
+                    space = size - (write_pos - self._read_pos)
+
+                # Only this thread writes, and the audio callback never
+                # reads past _write_pos, so the free span can be filled
+                # without holding the lock. Copy up to the wrap point or the
+                # unread data, whichever comes first.
+                start = write_pos % size
+                count = min(total - offset, space, size - start)
+                np.copyto(ring[start:start + count], samples[offset:offset + count])
+                offset += count
+
+                with self._ring_cond:
+                    # Drop the copy if playback was stopped or restarted
+                    # while it was being made
+                    if self._generation != generation:
+                        return False
+                    self._write_pos = write_pos + count
+                    self._ring_cond.notify_all()
 
         return not self._interrupted
 
@@ -148,10 +400,18 @@ class StreamingPlayer:
         Returns:
             Total duration in milliseconds
         """
-        self._queue.put(None)  # Sentinel to signal end
-
-        if self._playback_thread is not None:
-            self._playback_thread.join()
+        with self._ring_cond:
+            self._finished = True
+            self._ring_cond.notify_all()
+
+        # The callback stops the stream once the ring is empty, and PortAudio
+        # reports it drained after the device has played the last buffer.
+        # Stop waiting if the stream dies without getting there.
+        stream = self._stream
+        if stream is not None and not self._stream_stopped:
+            while not self._drained.wait(timeout=0.5):
+                if not stream.active:
+                    break
 
         with self._lock:
             duration_ms = (self._total_samples / self._sample_rate) * 1000
@@ -160,69 +420,113 @@ class StreamingPlayer:
 
     def stop(self) -> None:
         """Stop playback immediately."""
-        with self._lock:
+        # Discards unplayed audio and wakes a producer waiting for space
+        with self._ring_cond:
+            self._generation += 1
             self._interrupted = True
-
-        # Clear the queue
-        try:
-            while True:
-                self._queue.get_nowait()
-        except queue.Empty:
-            pass
-
-        self._queue.put(None)  # Ensure playback loop exits
-
-        if self._playback_thread is not None:
-            self._playback_thread.join(timeout=0.5)
+            self._read_pos = self._write_pos
+            self._ring_cond.notify_all()
 
         with self._lock:
             self._cleanup()
 
+    def close(self) -> None:
+        """Stop playback and release the output stream."""
+        self.stop()
+        with self._lock:
+            self._cancel_idle_timer()
+            self._close_stream()
+
     def is_playing(self) -> bool:
         """Check if audio is currently playing."""
         return self._playing
 
-    def _playback_loop(self) -> None:
-        """Background thread that writes audio chunks to the stream."""
-        while True:
-            try:
-                samples = self._queue.get(timeout=0.1)
-            except queue.Empty:
-                continue
+    def _pa_callback(self, outdata, frames: int, time_info, status) -> None:
+        """PortAudio callback: fill outdata with the next frames from the ring.
 
-            if samples is None:  # Sentinel
-                break
+        Runs on PortAudio's audio thread. Pads with silence when synthesis
+        hasn't kept up, and stops the stream after the last fed sample.
+        """
+        ring = self._ring
+        size = len(ring)
+        with self._ring_cond:
+            read_pos = self._read_pos
+            available = self._write_pos - read_pos
+            count = min(frames, available)
+            last = self._finished and count == available
+
+        # The producer never overwrites unread samples, so the copy needs
+        # no lock; it wraps at most once
+        copied = 0
+        while copied < count:
+            start = (read_pos + copied) % size
+            n = min(count - copied, size - start)
+            outdata[copied * _SAMPLE_BYTES:(copied + n) * _SAMPLE_BYTES] = ring[start:start + n]
+            copied += n
+        if count < frames:
+            pad = (frames - count) * _SAMPLE_BYTES
+            if len(self._silence) < pad:
+                self._silence = bytes(pad)
+            outdata[count * _SAMPLE_BYTES:] = self._silence[:pad]
+
+        with self._ring_cond:
+            # stop() may have discarded the ring in the meantime
+            if not self._interrupted:
+                self._read_pos = read_pos + count
+            self._ring_cond.notify_all()
+
+        if last:
+            raise sd.CallbackStop
 
-            if self._interrupted:
-                break
+    def _cleanup(self) -> None:
+        """End the current message. Must be called with lock held.
 
+        The stream is stopped but left open for the next message. An
+        interrupted message is aborted so buffered audio is dropped at once.
+        """
+        if self._stream is not None and not self._stream_stopped:
             try:
-                if self._stream is not None:
-                    self._stream.write(samples)
+                if self._interrupted:
+                    self._stream.abort()
+                else:
+                    self._stream.stop()
+                self._stream_stopped = True
             except sd.PortAudioError:
-                break
+                self._close_stream()
 
-        # Wait for the stream buffer to drain before returning
-        # This prevents the next message from cutting off the tail of this one
-        if self._stream is not None and not self._interrupted:
-            try:
-                # Calculate remaining buffer time and wait
-                # blocksize=1024 at 22050 Hz = ~46ms per block
-                # Give it a bit extra to ensure complete playback
-                import time
-                time.sleep(0.15)  # 150ms should cover the buffer
-            except Exception:
-                pass
+        self._playing = False
 
-    def _cleanup(self) -> None:
-        """Clean up stream resources. Must be called with lock held."""
+        if self._stream is not None:
+            self._cancel_idle_timer()
+            timer = threading.Timer(IDLE_CLOSE_SECONDS, self._close_idle_stream)
+            timer.daemon = True
+            self._idle_timer = timer
+            timer.start()
+
+    def _cancel_idle_timer(self) -> None:
+        """Cancel a pending idle close. Must be called with lock held."""
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _close_idle_stream(self) -> None:
+        """Idle timer callback: close the stream if nothing has played since."""
+        with self._lock:
+            # A newer message may have started, or rescheduled the timer
+            if self._playing or self._idle_timer is not threading.current_thread():
+                return
+            self._idle_timer = None
+            self._close_stream()
+
+    def _close_stream(self) -> None:
+        """Close the output stream, if open. Must be called with lock held."""
         if self._stream is not None:
             try:
-                self._stream.stop()
+                if not self._stream_stopped:
+                    self._stream.abort()
                 self._stream.close()
             except sd.PortAudioError:
                 pass
             self._stream = None
-
-        self._playing = False
-        self._playback_thread = None
+        self._stream_key = None
+        self._stream_stopped = False
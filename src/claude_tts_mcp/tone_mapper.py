@@ -1,9 +1,10 @@
 """Maps semantic tones to sherpa-onnx synthesis parameters."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import lru_cache
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToneParams:
     """Parameters for sherpa-onnx TTS synthesis."""
 
@@ -22,6 +23,16 @@ _TONE_PRESETS = {
 }
 
 
+@lru_cache(maxsize=64)
+def _compute(tone: str, speed: float) -> ToneParams:
+    base = _TONE_PRESETS.get(tone, _TONE_PRESETS["neutral"])
+    if speed == 1.0:
+        return base
+
+    # Speed affects length_scale inversely (faster = lower length_scale)
+    return replace(base, length_scale=base.length_scale / speed)
+
+
 class ToneMapper:
     """Converts semantic tone names to synthesis parameters."""
 
@@ -33,18 +44,10 @@ class ToneMapper:
             speed: Speech rate multiplier (0.5-2.0, default 1.0)
 
         Returns:
-            ToneParams with noise_scale, noise_scale_w, length_scale
+            ToneParams with noise_scale, noise_scale_w, length_scale.
+            Instances are cached and shared, hence immutable.
         """
-        base = _TONE_PRESETS.get(tone, _TONE_PRESETS["neutral"])
-
-        # Speed affects length_scale inversely (faster = lower length_scale)
-        adjusted_length = base.length_scale / speed
-
-        return ToneParams(
-            noise_scale=base.noise_scale,
-            noise_scale_w=base.noise_scale_w,
-            length_scale=adjusted_length,
-        )
+        return _compute(tone, speed)
 
     def available_tones(self) -> list[str]:
         """List all available tone names."""
@@ -1,5 +1,6 @@
 """Voice management - download and manage Piper TTS voices."""
 
+import os
 import sys
 from pathlib import Path
 from typing import Optional
@@ -39,6 +40,39 @@ def is_bundled_mode() -> bool:
     return get_bundled_voices_dir() is not None
 
 
+def _scan_voice_dirs(root: Path) -> tuple[dict[str, bool], bool]:
+    """Find voice directories under root that hold a model and tokens.
+
+    Reads each directory listing once instead of checking every file.
+
+    Returns:
+        Complete voice names mapped to whether they ship their own
+        espeak-ng-data, and whether every directory was a complete voice
+    """
+    voices = {}
+    complete = True
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if not entry.is_dir() or entry.name == "espeak-ng-data":
+                    continue
+                files = set()
+                has_espeak = False
+                with os.scandir(entry.path) as children:
+                    for child in children:
+                        if child.is_file():
+                            files.add(child.name)
+                        elif child.name == "espeak-ng-data" and child.is_dir():
+                            has_espeak = True
+                if f"{entry.name}.onnx" in files and "tokens.txt" in files:
+                    voices[entry.name] = has_espeak
+                else:
+                    complete = False
+    except OSError:
+        pass
+    return voices, complete
+
+
 class VoiceManager:
     """Manages Piper TTS voice downloads and paths."""
 
@@ -65,6 +99,14 @@ class VoiceManager:
         self._data_dir.mkdir(parents=True, exist_ok=True)
         self._voices_dir.mkdir(parents=True, exist_ok=True)
 
+        # Paths of every installed voice, rebuilt whenever the voices
+        # directory's mtime changes (a voice directory added or removed)
+        self._voice_index: dict[str, dict[str, Path]] = {}
+        # Whether every user voice directory was complete at the last scan
+        self._index_complete = False
+        self._index_mtime: Optional[int] = None
+        self.refresh()
+
     @property
     def data_dir(self) -> Path:
         """Get the base data directory."""
@@ -89,6 +131,17 @@ class VoiceManager:
         Returns:
             Dict with 'model', 'tokens', and 'data_dir' paths, or None if not available
         """
+        self._check_index()
+        paths = self._voice_index.get(voice_name)
+        if paths is None:
+            # Misses are checked on disk: a voice's files can appear inside
+            # an existing directory without touching the voices directory
+            paths = self._find_voice_paths(voice_name)
+            if paths is not None:
+                self._voice_index[voice_name] = paths
+        return paths
+
+    def _find_voice_paths(self, voice_name: str) -> Optional[dict[str, Path]]:
         # Check bundled voices first (for standalone binary)
         if self._bundled_dir is not None:
             bundled_voice_dir = self._bundled_dir / voice_name
@@ -141,22 +194,56 @@ class VoiceManager:
         Returns:
             List of voice names (bundled + user-installed)
         """
-        voices = set()
-
-        # Check bundled voices first
-        if self._bundled_dir is not None and self._bundled_dir.exists():
-            for voice_dir in self._bundled_dir.iterdir():
-                if voice_dir.is_dir() and voice_dir.name != "espeak-ng-data":
-                    voice_name = voice_dir.name
-                    if self.is_voice_available(voice_name):
-                        voices.add(voice_name)
-
-        # Add user-installed voices
-        if self._voices_dir.exists():
-            for voice_dir in self._voices_dir.iterdir():
-                if voice_dir.is_dir():
-                    voice_name = voice_dir.name
-                    if self.is_voice_available(voice_name):
-                        voices.add(voice_name)
-
-        return sorted(list(voices))
+        self._check_index()
+        # A voice directory that was missing files may have been completed
+        if not self._index_complete:
+            self.refresh()
+        return sorted(self._voice_index)
+
+    def refresh(self) -> None:
+        """Rescan the bundled and user voice directories.
+
+        Lookups pick up added and removed voice directories on their own;
+        call this after replacing files inside an existing voice directory.
+        """
+        try:
+            mtime = self._voices_dir.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+
+        index = {}
+        user_voices, complete = _scan_voice_dirs(self._voices_dir)
+        for name, has_espeak in user_voices.items():
+            voice_dir = self._voices_dir / name
+            index[name] = {
+                "model": voice_dir / f"{name}.onnx",
+                "tokens": voice_dir / "tokens.txt",
+                "data_dir": voice_dir / "espeak-ng-data" if has_espeak else self._espeak_dir,
+            }
+
+        # Bundled voices take precedence over user-installed ones
+        if self._bundled_dir is not None:
+            bundled_voices = _scan_voice_dirs(self._bundled_dir)[0]
+            if bundled_voices:
+                bundled_espeak = self._bundled_dir / "espeak-ng-data"
+                data_dir = bundled_espeak if bundled_espeak.exists() else self._espeak_dir
+                for name in bundled_voices:
+                    voice_dir = self._bundled_dir / name
+                    index[name] = {
+                        "model": voice_dir / f"{name}.onnx",
+                        "tokens": voice_dir / "tokens.txt",
+                        "data_dir": data_dir,
+                    }
+
+        self._voice_index = index
+        self._index_complete = complete
+        self._index_mtime = mtime
+
+    def _check_index(self) -> None:
+        """Rescan if the voices directory has changed since the last scan."""
+        try:
+            mtime = self._voices_dir.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is None or mtime != self._index_mtime:
+            self.refresh()
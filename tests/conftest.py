@@ -0,0 +1,38 @@
+"""Shared test setup.
+
+sherpa_onnx is replaced with a mock before any test module imports the
+engine, so the native library is never loaded. Tests configure it through
+the `sherpa` fixture in test_sherpa_engine.py.
+
+Where /dev/shm is available, tmp_path directories are created on it so the
+filesystem-heavy tests don't touch disk. Passing --basetemp overrides this.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.modules["sherpa_onnx"] = MagicMock(name="sherpa_onnx")
+
+# Per-run base directory created on /dev/shm, removed when the run ends
+_shm_basetemp: str | None = None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    global _shm_basetemp
+    # xdist workers are handed a basetemp by the controller
+    if config.option.basetemp is not None or hasattr(config, "workerinput"):
+        return
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        _shm_basetemp = tempfile.mkdtemp(prefix="speakup-pytest-", dir="/dev/shm")
+        config.option.basetemp = _shm_basetemp
+
+
+def pytest_unconfigure(config):
+    if _shm_basetemp is not None:
+        shutil.rmtree(_shm_basetemp, ignore_errors=True)
@@ -0,0 +1,172 @@
+"""Tests for HistoryStore - SQLite message history with a background writer."""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+from claude_tts_mcp import history
+from claude_tts_mcp.history import HistoryStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path for a fresh history database."""
+    return tmp_path / "history.db"
+
+
+@pytest.fixture
+def store(db_path):
+    """A HistoryStore on a fresh database, closed after the test."""
+    store = HistoryStore(db_path)
+    yield store
+    store.close()
+
+
+class TestHistoryStore:
+    """Test HistoryStore writes, reads and message IDs."""
+
+    def test_write_then_flush_then_read(self, store):
+        """Queued writes should be visible once flushed."""
+        first = store.add_message("proj", "hello", "calm")
+        second = store.add_message("proj", "world")
+        store.mark_playing(first)
+        store.flush()
+
+        rows = {row["id"]: dict(row) for row in store.get_recent()}
+
+        assert rows[first]["text"] == "hello"
+        assert rows[first]["tone"] == "calm"
+        assert rows[first]["status"] == "playing"
+        assert rows[second]["status"] == "queued"
+
+    def test_reads_wait_for_pending_writes(self, store):
+        """Reads should see writes queued before them without an explicit flush."""
+        message_id = store.add_message("proj", "hello")
+        store.mark_played(message_id, 1234.5)
+
+        (row,) = store.get_recent()
+
+        assert row["status"] == "played"
+        assert row["duration_ms"] == 1234.5
+
+    def test_ids_continue_after_reopen(self, db_path):
+        """A reopened store should never reuse an ID handed out before."""
+        store = HistoryStore(db_path)
+        ids = [store.add_message("proj", f"msg {i}") for i in range(3)]
+        store.close()
+
+        reopened = HistoryStore(db_path)
+        next_id = reopened.add_message("proj", "after reopen")
+        rows = reopened.get_recent()
+        reopened.close()
+
+        assert ids == [ids[0], ids[0] + 1, ids[0] + 2]
+        assert next_id == ids[-1] + 1
+        assert sorted(row["id"] for row in rows) == [*ids, next_id]
+
+    def test_mark_skipped_many(self, store):
+        """Only the given messages should be marked skipped."""
+        ids = [store.add_message("proj", f"msg {i}") for i in range(4)]
+
+        store.mark_skipped_many(ids[1:3])
+
+        statuses = {row["id"]: row["status"] for row in store.get_recent()}
+        assert statuses == {
+            ids[0]: "queued",
+            ids[1]: "skipped",
+            ids[2]: "skipped",
+            ids[3]: "queued",
+        }
+
+    def test_mark_skipped_many_empty_is_noop(self, store):
+        """An empty list should not queue a write or change the version."""
+        version = store.version
+
+        store.mark_skipped_many([])
+
+        assert store.version == version
+
+    def test_mark_queued_as_skipped_returns_count(self, store):
+        """Every queued message should be skipped, and the count returned."""
+        playing = store.add_message("proj", "playing")
+        store.mark_playing(playing)
+        store.add_message("proj", "queued 1")
+        store.add_message("proj", "queued 2")
+
+        assert store.mark_queued_as_skipped() == 2
+        assert [row["id"] for row in store.get_active()] == [playing]
+
+    def test_get_queued_and_playing(self, store):
+        """Queued messages come back oldest first; the playing one on its own."""
+        playing = store.add_message("proj", "playing")
+        store.mark_playing(playing)
+        queued = [store.add_message("proj", f"queued {i}") for i in range(2)]
+
+        assert [row["id"] for row in store.get_queued()] == queued
+        assert store.get_playing()["id"] == playing
+
+    @pytest.mark.parametrize(
+        "query", ["_SQL_QUEUED", "_SQL_PLAYING", "_SQL_ACTIVE", "_SQL_SKIP_QUEUED"]
+    )
+    def test_status_queries_use_active_index(self, store, query):
+        """Queries on active rows should search the partial index, not scan."""
+        sql = getattr(history, query)
+        plan = store._get_conn().execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+
+        assert any("idx_messages_active" in row["detail"] for row in plan)
+
+    def test_failed_commit_rolls_back(self, store):
+        """A COMMIT that fails should not leave the connection in a transaction."""
+        conn = store._get_conn()
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+        conn.execute("""
+            CREATE TABLE child (
+                parent_id INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED
+            )
+        """)
+
+        # The deferred foreign key is only checked, and fails, at COMMIT
+        with pytest.raises(sqlite3.IntegrityError):
+            with store._transaction() as txn:
+                txn.execute("INSERT INTO child VALUES (1)")
+
+        assert not conn.in_transaction
+        with store._transaction() as txn:
+            txn.execute("INSERT INTO parent VALUES (1)")
+
+    def test_in_memory_database_rejected(self):
+        """:memory: can't be shared with the writer thread, so it is refused."""
+        with pytest.raises(ValueError, match="memory"):
+            HistoryStore(Path(":memory:"))
+
+    def test_failing_write_does_not_stop_writer(self, store, capsys):
+        """A write raising a non-SQLite error should be reported and skipped."""
+        store._submit(lambda conn: 1 / 0)
+        message_id = store.add_message("proj", "after the failure")
+
+        (row,) = store.get_recent()
+
+        assert row["id"] == message_id
+        assert store._writer.is_alive()
+        assert "History write failed" in capsys.readouterr().err
+
+    def test_close_commits_pending_writes(self, db_path):
+        """close() should land queued writes and stop the writer thread."""
+        store = HistoryStore(db_path)
+        message_id = store.add_message("proj", "hello")
+
+        store.close()
+        store.close()
+
+        assert not store._writer.is_alive()
+        reopened = HistoryStore(db_path)
+        assert [row["id"] for row in reopened.get_recent()] == [message_id]
+        reopened.close()
+
+    def test_write_after_close_raises(self, store):
+        """Writes to a closed store should fail instead of being dropped."""
+        store.close()
+
+        with pytest.raises(RuntimeError, match="closed"):
+            store.add_message("proj", "too late")
@@ -0,0 +1,53 @@
+"""Tests for json_codec - JSON encoding with an optional orjson backend."""
+
+import pytest
+from claude_tts_mcp import json_codec
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def codec(request, monkeypatch):
+    """json_codec using orjson when installed, then forced onto the stdlib."""
+    if request.param == "orjson":
+        if json_codec.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(json_codec, "orjson", None)
+    return json_codec
+
+
+class TestJsonCodec:
+    """Test dumps/loads behave the same on either backend."""
+
+    def test_round_trip(self, codec):
+        """Data should survive dumps followed by loads."""
+        data = {"text": "héllo", "tone": "calm", "items": [1, 2.5, None, True]}
+
+        encoded = codec.dumps(data)
+
+        assert isinstance(encoded, bytes)
+        assert codec.loads(encoded) == data
+        assert codec.loads(encoded.decode()) == data
+
+    def test_compact_by_default(self, codec):
+        """Output should have no indentation or trailing newline by default."""
+        encoded = codec.dumps({"a": [1, 2]})
+
+        assert b"\n" not in encoded
+        assert codec.loads(encoded) == {"a": [1, 2]}
+
+    def test_indent_and_newline(self, codec):
+        """indent should pretty-print with two spaces; newline appends one."""
+        encoded = codec.dumps({"a": 1}, indent=True, newline=True)
+
+        assert encoded == b'{\n  "a": 1\n}\n'
+
+    def test_default_converts_unsupported_objects(self, codec):
+        """default should be used for objects JSON can't encode natively."""
+        encoded = codec.dumps({"ids": {3}}, default=sorted)
+
+        assert codec.loads(encoded) == {"ids": [3]}
+
+    def test_invalid_json_raises_decode_error(self, codec):
+        """Malformed input should raise json_codec.JSONDecodeError."""
+        with pytest.raises(codec.JSONDecodeError):
+            codec.loads(b"{not json")
@@ -1,26 +1,36 @@
 """Tests for MCP Server - thin client that talks to SpeakUp service."""
 
+from types import MappingProxyType
+
 import pytest
-from unittest.mock import patch, MagicMock
-from claude_tts_mcp.server import speak, stop, create_server
+from unittest.mock import Mock
+from claude_tts_mcp import server as _server_mod
+from claude_tts_mcp.server import _api_call, _start_service, speak, stop, create_server
+
+# Default service reply to every _api_call; read-only so no test can change it
+_OK_RESPONSE = MappingProxyType({"success": True, "message_id": 1, "queue_position": 0})
 
 
 class TestServerTools:
     """Test MCP server tools (thin client mode)."""
 
-    @pytest.fixture
-    def mock_api_call(self):
-        """Mock the _api_call function."""
-        with patch("claude_tts_mcp.server._api_call") as mock:
-            yield mock
+    @pytest.fixture(autouse=True)
+    def mock_api_call(self, monkeypatch):
+        """Mock the _api_call function, with the service reported running.
+
+        Calls return _OK_RESPONSE unless a test sets another return_value.
+        """
+        mock = Mock(spec=_api_call, return_value=_OK_RESPONSE)
+        monkeypatch.setattr(_server_mod, "_api_call", mock)
+        monkeypatch.setattr(_server_mod, "_is_service_running", lambda: True)
+        return mock
 
-    @pytest.fixture
-    def mock_service_running(self):
-        """Mock _is_service_running to return True."""
-        with patch("claude_tts_mcp.server._is_service_running", return_value=True):
-            yield
+    @staticmethod
+    def endpoints(mock_api_call):
+        """Endpoints passed to _api_call, in call order."""
+        return [c.args[0] if c.args else c.kwargs["endpoint"] for c in mock_api_call.call_args_list]
 
-    def test_speak_returns_success(self, mock_api_call, mock_service_running):
+    def test_speak_returns_success(self, mock_api_call):
         """speak() should return success with message_id."""
         mock_api_call.return_value = {
             "success": True,
@@ -33,32 +43,26 @@ class TestServerTools:
         assert result["success"] is True
         assert "message_id" in result
 
-    def test_speak_sends_to_service(self, mock_api_call, mock_service_running):
+    def test_speak_sends_to_service(self, mock_api_call):
         """speak() should POST to the service."""
-        mock_api_call.return_value = {"success": True, "message_id": 1, "queue_position": 0}
-
         speak(text="Test message", tone="excited", speed=1.5)
 
-        # Check that speak endpoint was called
-        calls = [c for c in mock_api_call.call_args_list if "/api/speak" in str(c)]
-        assert len(calls) >= 1
+        # Check that speak endpoint was called, last
+        assert self.endpoints(mock_api_call)[-1] == "/api/speak"
 
         # Verify the data sent
-        speak_call = calls[-1]
-        data = speak_call.kwargs.get("data") or speak_call[1].get("data")
+        data = mock_api_call.call_args.kwargs["data"]
         assert data["text"] == "Test message"
         assert data["tone"] == "excited"
         assert data["speed"] == 1.5
 
-    def test_speak_with_interrupt_calls_stop(self, mock_api_call, mock_service_running):
+    def test_speak_with_interrupt_calls_stop(self, mock_api_call):
         """speak() with interrupt=True should call stop first."""
-        mock_api_call.return_value = {"success": True, "message_id": 1, "queue_position": 0}
-
         speak(text="Interrupt!", interrupt=True)
 
         # Should have called /api/stop before /api/speak
-        stop_calls = [c for c in mock_api_call.call_args_list if "/api/stop" in str(c)]
-        assert len(stop_calls) >= 1
+        endpoints = self.endpoints(mock_api_call)
+        assert endpoints.index("/api/stop") < endpoints.index("/api/speak")
 
     def test_speak_empty_text_returns_success(self):
         """speak() with empty text should return success with 0 duration."""
@@ -67,17 +71,16 @@ class TestServerTools:
         assert result["success"] is True
         assert result["duration_ms"] == 0
 
-    def test_stop_calls_service(self, mock_api_call, mock_service_running):
+    def test_stop_calls_service(self, mock_api_call):
         """stop() should call the service."""
         mock_api_call.return_value = {"success": True, "cleared": 2}
 
         result = stop()
 
         assert result["success"] is True
-        stop_calls = [c for c in mock_api_call.call_args_list if "/api/stop" in str(c)]
-        assert len(stop_calls) >= 1
+        assert "/api/stop" in self.endpoints(mock_api_call)
 
-    def test_speak_returns_error_if_service_fails(self, mock_api_call, mock_service_running):
+    def test_speak_returns_error_if_service_fails(self, mock_api_call):
         """speak() should return error if service returns error."""
         mock_api_call.return_value = {"error": "Service error"}
 
@@ -86,15 +89,14 @@ class TestServerTools:
         assert result["success"] is False
         assert "error" in result
 
-    def test_speak_starts_service_if_not_running(self, mock_api_call):
+    def test_speak_starts_service_if_not_running(self, mock_api_call, monkeypatch):
         """speak() should start service if not running."""
-        with patch("claude_tts_mcp.server._is_service_running", return_value=False), \
-             patch("claude_tts_mcp.server._start_service", return_value=True) as mock_start:
-            mock_api_call.return_value = {"success": True, "message_id": 1, "queue_position": 0}
-
-            speak(text="Test")
+        mock_start = Mock(spec=_start_service, return_value=True)
+        monkeypatch.setattr(_server_mod, "_is_service_running", lambda: False)
+        monkeypatch.setattr(_server_mod, "_start_service", mock_start)
+        speak(text="Test")
 
-            mock_start.assert_called_once()
+        mock_start.assert_called_once()
 
 
 class TestServerInitialization:
@@ -0,0 +1,178 @@
+"""Tests for ServiceClient - keep-alive JSON client for the service API."""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from claude_tts_mcp.service_client import ServiceClient, wait_until
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the service, recording each request it gets."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append((self.command, self.path, self.client_address))
+        if self.path == "/api/broken":
+            self._send(500, b"Internal Server Error", "text/plain")
+        elif self.path == "/api/close":
+            # Drop the connection after answering, without telling the client
+            self._send(200, b'{"status": "ok"}')
+            self.close_connection = True
+        else:
+            self._send(200, b'{"status": "ok"}')
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length)) if length else {}
+        self.server.requests.append((self.command, self.path, self.client_address))
+        if self.path == "/api/slow":
+            time.sleep(0.5)
+        if not data.get("text"):
+            self._send(400, b'{"error": "No text provided"}')
+        else:
+            self._send(200, json.dumps({"echo": data["text"]}).encode())
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """A local HTTP server on a free port, shut down after the test."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client(server):
+    """A ServiceClient pointed at the test server."""
+    client = ServiceClient(port=server.server_address[1])
+    yield client
+    client.close()
+
+
+class TestServiceClient:
+    """Test ServiceClient connection handling and response mapping."""
+
+    def test_reuses_connection_across_calls(self, client, server):
+        """Consecutive calls should share one TCP connection."""
+        assert client.request("/api/health") == {"status": "ok"}
+        assert client.request("/api/health") == {"status": "ok"}
+
+        ports = {address for _, _, address in server.requests}
+        assert len(server.requests) == 2
+        assert len(ports) == 1
+
+    def test_reconnects_after_server_closes_connection(self, client, server):
+        """A connection the server dropped should be replaced transparently."""
+        assert client.request("/api/close") == {"status": "ok"}
+        # Give the server time to close its end of the connection
+        time.sleep(0.1)
+
+        assert client.request("/api/health") == {"status": "ok"}
+
+        ports = [address for _, _, address in server.requests]
+        assert len(ports) == 2
+        assert ports[0] != ports[1]
+
+    def test_timeout_is_not_retried(self, client, server):
+        """A POST that times out should reach the server only once."""
+        assert client.request("/api/health") == {"status": "ok"}
+
+        result = client.request("/api/slow", "POST", {"text": "hi"}, timeout=0.2)
+        time.sleep(0.5)
+
+        assert result["unreachable"] is True
+        posts = [path for method, path, _ in server.requests if method == "POST"]
+        assert posts == ["/api/slow"]
+
+    def test_posts_json_body(self, client):
+        """The data dict should be sent as the JSON request body."""
+        assert client.request("/api/speak", "POST", {"text": "hello"}) == {"echo": "hello"}
+
+    def test_error_status_returns_service_error(self, client):
+        """A non-2xx JSON response should be returned as the service sent it."""
+        result = client.request("/api/speak", "POST", {"text": ""})
+
+        assert result == {"error": "No text provided"}
+
+    def test_non_json_response_returns_error(self, client):
+        """A response that isn't JSON should map to an error with its status."""
+        result = client.request("/api/broken")
+
+        assert result == {"error": "Invalid response from service (HTTP 500)"}
+        # The connection is still usable afterwards
+        assert client.request("/api/health") == {"status": "ok"}
+
+    def test_unreachable_service_returns_error(self):
+        """A refused connection should be reported, not raised."""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        client = ServiceClient(port=port)
+
+        result = client.request("/api/health", timeout=1)
+
+        assert result["unreachable"] is True
+        assert result["error"].startswith("Service not reachable")
+
+    def test_healthy_probe_is_cached(self, server):
+        """is_running should trust a healthy probe for health_ttl seconds."""
+        client = ServiceClient(port=server.server_address[1], health_ttl=60)
+
+        assert client.is_running()
+        assert client.is_running()
+        assert len(server.requests) == 1
+
+        client.forget_health()
+        assert client.is_running()
+        assert len(server.requests) == 2
+        client.close()
+
+    def test_unreachable_request_drops_health_cache(self, server):
+        """A failed request should make the next is_running probe again."""
+        client = ServiceClient(port=server.server_address[1], health_ttl=60)
+        assert client.is_running()
+
+        server.shutdown()
+        server.server_close()
+        client.close()
+
+        assert client.request("/api/status", timeout=1)["unreachable"] is True
+        assert not client.is_running(timeout=1)
+
+
+class TestWaitUntil:
+    """Test wait_until polls with backoff up to its timeout."""
+
+    def test_returns_once_condition_holds(self):
+        """wait_until should return True as soon as the condition holds."""
+        calls = []
+
+        assert wait_until(lambda: calls.append(None) or len(calls) >= 3, timeout=5)
+        assert len(calls) == 3
+
+    def test_gives_up_after_timeout(self):
+        """wait_until should return False if the condition never holds."""
+        start = time.monotonic()
+
+        assert not wait_until(lambda: False, timeout=0.1)
+        assert time.monotonic() - start < 1
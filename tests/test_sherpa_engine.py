@@ -2,113 +2,136 @@
 
 import numpy as np
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import MagicMock
+from claude_tts_mcp import sherpa_engine
 from claude_tts_mcp.sherpa_engine import SherpaEngine
 from claude_tts_mcp.tone_mapper import ToneParams
 
 
+@pytest.fixture
+def sherpa():
+    """Reset the sherpa_onnx stub from conftest.py; returns (mock_sherpa, mock_tts).
+
+    The TTS reports a 22050 Hz sample rate and generates a single sample;
+    tests override tts.sample_rate or tts.generate.return_value as needed.
+    """
+    mock_sherpa = sherpa_engine.sherpa_onnx
+    mock_sherpa.reset_mock(return_value=True, side_effect=True)
+
+    mock_tts = MagicMock()
+    mock_tts.sample_rate = 22050
+    mock_sherpa.OfflineTts.return_value = mock_tts
+
+    mock_audio = MagicMock()
+    mock_audio.samples = [0.0]
+    mock_tts.generate.return_value = mock_audio
+
+    return mock_sherpa, mock_tts
+
+
 class TestSherpaEngine:
     """Test SherpaEngine wraps sherpa-onnx correctly."""
 
-    def test_synthesize_returns_audio_samples(self):
+    def test_synthesize_returns_audio_samples(self, sherpa):
         """Synthesize should return numpy array of audio samples."""
-        with patch("claude_tts_mcp.sherpa_engine.sherpa_onnx") as mock_sherpa:
-            # Setup mock TTS
-            mock_tts = MagicMock()
-            mock_sherpa.OfflineTts.return_value = mock_tts
-            mock_tts.sample_rate = 22050
-
-            # Mock generated audio
-            mock_audio = MagicMock()
-            mock_audio.samples = [0.1, 0.2, 0.3, 0.4, 0.5]
-            mock_tts.generate.return_value = mock_audio
+        _, mock_tts = sherpa
+        mock_tts.generate.return_value.samples = [0.1, 0.2, 0.3, 0.4, 0.5]
 
-            engine = SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
-            params = ToneParams(noise_scale=0.667, noise_scale_w=0.8, length_scale=1.0)
+        engine = SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
+        params = ToneParams(noise_scale=0.667, noise_scale_w=0.8, length_scale=1.0)
 
-            samples, sample_rate = engine.synthesize("Hello", params)
+        samples, sample_rate = engine.synthesize("Hello", params)
 
-            assert isinstance(samples, np.ndarray)
-            assert sample_rate == 22050
-            assert len(samples) == 5
+        assert isinstance(samples, np.ndarray)
+        assert sample_rate == 22050
+        assert len(samples) == 5
 
-    def test_synthesize_passes_parameters_to_sherpa(self):
+    def test_synthesize_passes_parameters_to_sherpa(self, sherpa):
         """Synthesize should pass tone parameters to sherpa-onnx."""
-        with patch("claude_tts_mcp.sherpa_engine.sherpa_onnx") as mock_sherpa:
-            mock_tts = MagicMock()
-            mock_sherpa.OfflineTts.return_value = mock_tts
-            mock_tts.sample_rate = 22050
-
-            mock_audio = MagicMock()
-            mock_audio.samples = [0.0]
-            mock_tts.generate.return_value = mock_audio
+        _, mock_tts = sherpa
 
-            engine = SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
-            params = ToneParams(noise_scale=0.5, noise_scale_w=0.6, length_scale=1.2)
+        engine = SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
+        params = ToneParams(noise_scale=0.5, noise_scale_w=0.6, length_scale=1.2)
 
-            engine.synthesize("Test", params)
+        engine.synthesize("Test", params)
 
-            # Verify generate was called with text and speed
-            mock_tts.generate.assert_called_once()
-            call_args = mock_tts.generate.call_args
-            assert call_args.kwargs["text"] == "Test"
-            # length_scale affects speed inversely
-            assert call_args.kwargs["speed"] == pytest.approx(1 / 1.2, rel=0.01)
+        # Verify generate was called with text and speed;
+        # length_scale affects speed inversely
+        mock_tts.generate.assert_called_once_with(text="Test", sid=0, speed=1 / 1.2)
 
-    def test_synthesize_empty_text_returns_empty_array(self):
+    def test_synthesize_empty_text_returns_empty_array(self, sherpa):
         """Synthesizing empty text should return empty array."""
-        with patch("claude_tts_mcp.sherpa_engine.sherpa_onnx") as mock_sherpa:
-            mock_tts = MagicMock()
-            mock_sherpa.OfflineTts.return_value = mock_tts
-            mock_tts.sample_rate = 22050
+        _, mock_tts = sherpa
+
+        engine = SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
+        params = ToneParams(noise_scale=0.667, noise_scale_w=0.8, length_scale=1.0)
+
+        samples, sample_rate = engine.synthesize("", params)
 
-            engine = SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
-            params = ToneParams(noise_scale=0.667, noise_scale_w=0.8, length_scale=1.0)
+        assert len(samples) == 0
+        mock_tts.generate.assert_not_called()
 
-            samples, sample_rate = engine.synthesize("", params)
+    def test_synthesize_streaming_passes_contiguous_float32(self, sherpa):
+        """Streamed chunks should be contiguous float32, copied only when needed."""
+        _, mock_tts = sherpa
+        ready = np.zeros(4, dtype=np.float32)
+        strided = np.arange(8, dtype=np.float32)[::2]
+        mock_tts.generate.side_effect = lambda callback, **kwargs: (
+            callback(ready, 0.5), callback(strided, 1.0)
+        )
+        chunks = []
 
-            assert len(samples) == 0
-            mock_tts.generate.assert_not_called()
+        def collect(chunk):
+            chunks.append(chunk)
+            return True
 
-    def test_sample_rate_property(self):
+        engine = SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
+        params = ToneParams(noise_scale=0.667, noise_scale_w=0.8, length_scale=1.0)
+        engine.synthesize_streaming("Hello", params, collect)
+
+        assert chunks[0] is ready
+        assert chunks[1].flags.c_contiguous
+        assert chunks[1].tolist() == [0.0, 2.0, 4.0, 6.0]
+
+    def test_sample_rate_property(self, sherpa):
         """Engine should expose sample rate from model."""
-        with patch("claude_tts_mcp.sherpa_engine.sherpa_onnx") as mock_sherpa:
-            mock_tts = MagicMock()
-            mock_sherpa.OfflineTts.return_value = mock_tts
-            mock_tts.sample_rate = 44100
+        _, mock_tts = sherpa
+        mock_tts.sample_rate = 44100
 
-            engine = SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
+        engine = SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
 
-            assert engine.sample_rate == 44100
+        assert engine.sample_rate == 44100
 
-    def test_is_loaded_property(self):
+    def test_is_loaded_property(self, sherpa):
         """Engine should report whether model is loaded."""
-        with patch("claude_tts_mcp.sherpa_engine.sherpa_onnx") as mock_sherpa:
-            mock_tts = MagicMock()
-            mock_sherpa.OfflineTts.return_value = mock_tts
-            mock_tts.sample_rate = 22050
-
-            engine = SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
+        engine = SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
 
-            assert engine.is_loaded is True
+        assert engine.is_loaded is True
 
-    def test_engine_configures_vits_model(self):
+    def test_engine_configures_vits_model(self, sherpa):
         """Engine should configure sherpa-onnx with VITS model settings."""
-        with patch("claude_tts_mcp.sherpa_engine.sherpa_onnx") as mock_sherpa:
-            mock_tts = MagicMock()
-            mock_sherpa.OfflineTts.return_value = mock_tts
-            mock_tts.sample_rate = 22050
-
-            engine = SherpaEngine(
-                model_path="/path/to/model.onnx",
-                tokens_path="/path/to/tokens.txt",
-                data_dir="/path/to/espeak-ng-data",
-            )
-
-            # Verify config was created with correct paths
-            mock_sherpa.OfflineTtsConfig.assert_called_once()
-            config_call = mock_sherpa.OfflineTtsConfig.call_args
-            model_config = config_call.kwargs.get("model") or config_call.args[0]
-
-            # The model should be a VITS config
-            assert model_config is not None
+        mock_sherpa, _ = sherpa
+
+        engine = SherpaEngine(
+            model_path="/path/to/model.onnx",
+            tokens_path="/path/to/tokens.txt",
+            data_dir="/path/to/espeak-ng-data",
+        )
+
+        # Verify config was created with correct paths
+        mock_sherpa.OfflineTtsConfig.assert_called_once()
+        config_call = mock_sherpa.OfflineTtsConfig.call_args
+        model_config = config_call.kwargs.get("model") or config_call.args[0]
+
+        # The model should be a VITS config
+        assert model_config is not None
+
+    def test_engine_uses_thread_count_from_environment(self, sherpa, monkeypatch):
+        """SPEAKUP_TTS_THREADS should set the inference thread count."""
+        mock_sherpa, _ = sherpa
+        monkeypatch.setenv("SPEAKUP_TTS_THREADS", "3")
+
+        SherpaEngine(model_path="/fake/model.onnx", tokens_path="/fake/tokens.txt")
+
+        model_call = mock_sherpa.OfflineTtsModelConfig.call_args
+        assert model_call.kwargs["num_threads"] == 3
@@ -1,10 +1,13 @@
 """Tests for StreamingPlayer - streaming audio playback with sounddevice."""
 
 import numpy as np
-import pytest
 from unittest.mock import patch, MagicMock
 from claude_tts_mcp.streaming_player import StreamingPlayer
 
+# Shared input for feed() tests; the player copies it and never writes to it
+_ZERO_1K = np.zeros(1000, dtype=np.float32)
+_ZERO_1K.flags.writeable = False
+
 
 class TestStreamingPlayer:
     """Test StreamingPlayer streams audio and supports interruption."""
@@ -13,18 +16,15 @@ class TestStreamingPlayer:
         """start() should initialize the audio stream."""
         player = StreamingPlayer()
 
-        with patch("claude_tts_mcp.streaming_player.sd.OutputStream") as mock_stream_class, \
-             patch("claude_tts_mcp.streaming_player.threading.Thread") as mock_thread_class:
+        with patch("claude_tts_mcp.streaming_player.sd.RawOutputStream") as mock_stream_class:
             mock_stream = MagicMock()
             mock_stream_class.return_value = mock_stream
-            mock_thread = MagicMock()
-            mock_thread_class.return_value = mock_thread
 
             player.start(sample_rate=22050)
 
             mock_stream_class.assert_called_once()
+            assert mock_stream_class.call_args.kwargs["callback"] == player._pa_callback
             mock_stream.start.assert_called_once()
-            mock_thread.start.assert_called_once()
             assert player.is_playing() is True
 
     def test_feed_queues_samples(self):
@@ -33,11 +33,11 @@ class TestStreamingPlayer:
         player._playing = True
         player._interrupted = False
 
-        samples = np.zeros(1000, dtype=np.float32)
+        samples = _ZERO_1K
         result = player.feed(samples)
 
         assert result is True
-        assert not player._queue.empty()
+        assert player._write_pos - player._read_pos == 1000
 
     def test_feed_returns_false_when_interrupted(self):
         """feed() should return False when playback is interrupted."""
@@ -45,7 +45,7 @@ class TestStreamingPlayer:
         player._playing = True
         player._interrupted = True
 
-        samples = np.zeros(1000, dtype=np.float32)
+        samples = _ZERO_1K
         result = player.feed(samples)
 
         assert result is False
@@ -55,7 +55,6 @@ class TestStreamingPlayer:
         player = StreamingPlayer()
         player._playing = True
         player._interrupted = False
-        player._playback_thread = None  # Don't create real thread
 
         player.stop()
 
@@ -76,12 +75,11 @@ class TestStreamingPlayer:
         player._sample_rate = 22050
         player._total_samples = 22050  # 1 second of audio
         player._playing = True
-        player._playback_thread = None
 
         with patch.object(player, "_cleanup"):
             duration = player.finish()
 
-        assert duration == pytest.approx(1000, rel=0.01)
+        assert duration == 1000.0
 
     def test_feed_tracks_total_samples(self):
         """feed() should track total samples for duration calculation."""
@@ -90,7 +88,22 @@ class TestStreamingPlayer:
         player._interrupted = False
         player._total_samples = 0
 
-        samples = np.zeros(1000, dtype=np.float32)
+        samples = _ZERO_1K
         player.feed(samples)
 
         assert player._total_samples == 1000
+
+    def test_idle_stream_is_closed_after_timeout(self):
+        """An open stream should be closed once it has been idle long enough."""
+        player = StreamingPlayer()
+
+        with patch("claude_tts_mcp.streaming_player.sd.RawOutputStream") as mock_stream_class, \
+                patch("claude_tts_mcp.streaming_player.IDLE_CLOSE_SECONDS", 0.2):
+            mock_stream = mock_stream_class.return_value
+            player.start(sample_rate=22050)
+            player.stop()
+            idle_timer = player._idle_timer
+            idle_timer.join(timeout=2)
+
+        mock_stream.close.assert_called_once()
+        assert player._stream is None
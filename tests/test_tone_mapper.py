@@ -1,102 +1,86 @@
 """Tests for ToneMapper - converts semantic tones to sherpa-onnx parameters."""
 
+from operator import gt, lt
+
 import pytest
-from claude_tts_mcp.tone_mapper import ToneMapper, ToneParams
+from claude_tts_mcp.tone_mapper import ToneMapper
+
+
+@pytest.fixture(scope="session")
+def mapper():
+    """One ToneMapper shared by every test; none of them modify it."""
+    return ToneMapper()
 
 
 class TestToneMapper:
     """Test ToneMapper converts tones to synthesis parameters."""
 
-    def test_neutral_tone_returns_default_parameters(self):
+    def test_neutral_tone_returns_default_parameters(self, mapper):
         """Neutral tone should return balanced default parameters."""
-        mapper = ToneMapper()
-
         params = mapper.get_params("neutral")
 
-        assert params.noise_scale == pytest.approx(0.667, rel=0.01)
-        assert params.noise_scale_w == pytest.approx(0.8, rel=0.01)
-        assert params.length_scale == pytest.approx(1.0, rel=0.01)
-
-    def test_excited_tone_has_more_variation_and_faster(self):
-        """Excited tone should have more variation and be slightly faster."""
-        mapper = ToneMapper()
-
-        params = mapper.get_params("excited")
-
-        # More variation (higher noise scales)
-        assert params.noise_scale > 0.667
-        assert params.noise_scale_w > 0.8
-        # Faster (lower length_scale)
-        assert params.length_scale < 1.0
-
-    def test_concerned_tone_has_less_variation_and_slower(self):
-        """Concerned tone should be steadier and slower."""
-        mapper = ToneMapper()
-
-        params = mapper.get_params("concerned")
-
-        # Less variation (lower noise scales)
-        assert params.noise_scale < 0.667
-        assert params.noise_scale_w < 0.8
-        # Slower (higher length_scale)
-        assert params.length_scale > 1.0
-
-    def test_calm_tone_is_steady_and_relaxed(self):
-        """Calm tone should be very steady with minimal variation."""
-        mapper = ToneMapper()
-
-        params = mapper.get_params("calm")
-
-        # Very low variation
-        assert params.noise_scale < 0.5
-        assert params.noise_scale_w < 0.6
-        # Relaxed pace
-        assert params.length_scale > 1.1
-
-    def test_urgent_tone_is_punchy_and_fast(self):
-        """Urgent tone should be energetic and fast."""
-        mapper = ToneMapper()
-
-        params = mapper.get_params("urgent")
-
-        # Moderate-high variation for energy
-        assert params.noise_scale > 0.6
-        # Fast pace
-        assert params.length_scale < 0.9
-
-    def test_unknown_tone_defaults_to_neutral(self):
+        assert params.noise_scale == 0.667
+        assert params.noise_scale_w == 0.8
+        assert params.length_scale == 1.0
+
+    @pytest.mark.parametrize(
+        "tone, noise_scale, noise_scale_w, length_scale",
+        [
+            # More variation (higher noise scales), slightly faster
+            ("excited", (gt, 0.667), (gt, 0.8), (lt, 1.0)),
+            # Steadier (lower noise scales) and slower
+            ("concerned", (lt, 0.667), (lt, 0.8), (gt, 1.0)),
+            # Very low variation, relaxed pace
+            ("calm", (lt, 0.5), (lt, 0.6), (gt, 1.1)),
+            # Moderate-high variation for energy, fast pace
+            ("urgent", (gt, 0.6), None, (lt, 0.9)),
+        ],
+    )
+    def test_tone_characteristics(self, mapper, tone, noise_scale, noise_scale_w, length_scale):
+        """Each tone's parameters should fall on the expected side of neutral."""
+        params = mapper.get_params(tone)
+
+        bounds = {
+            "noise_scale": noise_scale,
+            "noise_scale_w": noise_scale_w,
+            "length_scale": length_scale,
+        }
+        for name, bound in bounds.items():
+            if bound is not None:
+                compare, limit = bound
+                assert compare(getattr(params, name), limit), f"{tone}: {name}"
+
+    def test_unknown_tone_defaults_to_neutral(self, mapper):
         """Unknown tones should fall back to neutral."""
-        mapper = ToneMapper()
-
         params = mapper.get_params("unknown_tone")
         neutral = mapper.get_params("neutral")
 
-        assert params.noise_scale == neutral.noise_scale
-        assert params.noise_scale_w == neutral.noise_scale_w
-        assert params.length_scale == neutral.length_scale
+        assert params is neutral
 
-    def test_speed_multiplier_affects_length_scale(self):
+    def test_speed_multiplier_affects_length_scale(self, mapper):
         """Speed parameter should multiply the length_scale inversely."""
-        mapper = ToneMapper()
-
         # Speed 2.0 = twice as fast = half the length_scale
         params = mapper.get_params("neutral", speed=2.0)
 
-        assert params.length_scale == pytest.approx(0.5, rel=0.01)
+        assert params.length_scale == 0.5
 
-    def test_speed_slow_increases_length_scale(self):
+    def test_speed_slow_increases_length_scale(self, mapper):
         """Slow speed should increase length_scale."""
-        mapper = ToneMapper()
-
         # Speed 0.5 = half as fast = double the length_scale
         params = mapper.get_params("neutral", speed=0.5)
 
-        assert params.length_scale == pytest.approx(2.0, rel=0.01)
+        assert params.length_scale == 2.0
 
-    def test_list_available_tones(self):
-        """Should be able to list all available tones."""
-        mapper = ToneMapper()
+    def test_repeat_calls_share_cached_params(self, mapper):
+        """Repeated (tone, speed) lookups should return the same instance."""
+        params = mapper.get_params("calm", speed=1.5)
 
+        assert ToneMapper().get_params("calm", speed=1.5) is params
+        with pytest.raises(AttributeError):
+            params.length_scale = 1.0
+
+    def test_list_available_tones(self, mapper):
+        """Should be able to list all available tones."""
         tones = mapper.available_tones()
 
         assert "neutral" in tones
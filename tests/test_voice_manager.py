@@ -1,11 +1,26 @@
 """Tests for VoiceManager - download and manage Piper voices."""
 
+import shutil
+
 import pytest
 from pathlib import Path
 from unittest.mock import patch
 from claude_tts_mcp.voice_manager import VoiceManager
 
 
+@pytest.fixture
+def make_voice(tmp_path):
+    """Factory that installs an empty voice under tmp_path/voices."""
+    def _make_voice(name: str) -> Path:
+        voice_dir = tmp_path / "voices" / name
+        voice_dir.mkdir(parents=True, exist_ok=True)
+        (voice_dir / f"{name}.onnx").write_bytes(b"")
+        (voice_dir / "tokens.txt").write_bytes(b"")
+        return voice_dir
+
+    return _make_voice
+
+
 class TestVoiceManager:
     """Test VoiceManager handles voice download and paths."""
 
@@ -24,15 +39,12 @@ class TestVoiceManager:
         assert (tmp_path / "tts-data").exists()
         assert (tmp_path / "tts-data" / "voices").exists()
 
-    def test_get_voice_path_returns_model_paths(self, tmp_path):
+    def test_get_voice_path_returns_model_paths(self, tmp_path, make_voice):
         """get_voice_path should return paths to model files."""
         manager = VoiceManager(data_dir=tmp_path)
 
         # Create fake voice files
-        voice_dir = tmp_path / "voices" / "en_US-hfc_male-medium"
-        voice_dir.mkdir(parents=True)
-        (voice_dir / "en_US-hfc_male-medium.onnx").touch()
-        (voice_dir / "tokens.txt").touch()
+        voice_dir = make_voice("en_US-hfc_male-medium")
 
         paths = manager.get_voice_paths("en_US-hfc_male-medium")
 
@@ -47,7 +59,7 @@ class TestVoiceManager:
 
         assert paths is None
 
-    def test_is_voice_available(self, tmp_path):
+    def test_is_voice_available(self, tmp_path, make_voice):
         """is_voice_available should check if voice files exist."""
         manager = VoiceManager(data_dir=tmp_path)
 
@@ -55,10 +67,7 @@ class TestVoiceManager:
         assert manager.is_voice_available("en_US-hfc_male-medium") is False
 
         # Create voice files
-        voice_dir = tmp_path / "voices" / "en_US-hfc_male-medium"
-        voice_dir.mkdir(parents=True)
-        (voice_dir / "en_US-hfc_male-medium.onnx").touch()
-        (voice_dir / "tokens.txt").touch()
+        make_voice("en_US-hfc_male-medium")
 
         # Now available
         assert manager.is_voice_available("en_US-hfc_male-medium") is True
@@ -90,7 +99,7 @@ class TestVoiceManager:
         paths = manager.get_voice_paths("en_US-test-medium")
         assert paths is not None
 
-    def test_list_available_voices(self, tmp_path):
+    def test_list_available_voices(self, tmp_path, make_voice):
         """list_available_voices should return installed voice names."""
         manager = VoiceManager(data_dir=tmp_path)
 
@@ -98,13 +107,29 @@ class TestVoiceManager:
         assert manager.list_available_voices() == []
 
         # Add some voices
-        (tmp_path / "voices" / "voice1").mkdir(parents=True)
-        (tmp_path / "voices" / "voice1" / "voice1.onnx").touch()
-        (tmp_path / "voices" / "voice1" / "tokens.txt").touch()
-
-        (tmp_path / "voices" / "voice2").mkdir(parents=True)
-        (tmp_path / "voices" / "voice2" / "voice2.onnx").touch()
-        (tmp_path / "voices" / "voice2" / "tokens.txt").touch()
+        make_voice("voice1")
+        make_voice("voice2")
 
         voices = manager.list_available_voices()
         assert set(voices) == {"voice1", "voice2"}
+
+    def test_removed_voice_is_no_longer_listed(self, tmp_path, make_voice):
+        """Cached lookups should be dropped when a voice directory is removed."""
+        manager = VoiceManager(data_dir=tmp_path)
+        voice_dir = make_voice("voice1")
+        assert manager.list_available_voices() == ["voice1"]
+        assert manager.is_voice_available("voice1") is True
+
+        shutil.rmtree(voice_dir)
+
+        assert manager.list_available_voices() == []
+        assert manager.is_voice_available("voice1") is False
+
+    def test_voice_installed_before_init_uses_its_own_espeak_data(self, tmp_path, make_voice):
+        """Voices indexed at startup should keep their bundled espeak-ng-data."""
+        voice_dir = make_voice("voice1")
+        (voice_dir / "espeak-ng-data").mkdir()
+
+        manager = VoiceManager(data_dir=tmp_path)
+
+        assert manager.get_voice_paths("voice1")["data_dir"] == voice_dir / "espeak-ng-data"